@@ -15,6 +15,7 @@ This allows multiple E-1608 and E-TC boards, each with their own channels.
 
 __version__ = "2.1.0"  # Added blocking field to DigitalOutCfg
 
+from functools import cached_property
 from pydantic import BaseModel
 from typing import List, Optional
 
@@ -70,6 +71,11 @@ class Board1608Cfg(BaseModel):
     digitalOutputs: List[DigitalOutCfg] = []
     analogOutputs: List[AnalogOutCfg] = []
 
+    @cached_property
+    def ai_single_ended(self) -> bool:
+        """aiMode resolved once: True for single-ended ("SE"), False for differential"""
+        return str(self.aiMode).upper().startswith("SE")
+
 class BoardEtcCfg(BaseModel):
     """E-TC Board Configuration (Thermocouples)"""
     boardNum: int = 1
@@ -542,6 +542,9 @@ class Evaluator:
         'clamp': lambda x, lo, hi: max(lo, min(hi, x)),
     }
     
+    # AST node type -> evaluation method (filled in below the class)
+    _NODE_HANDLERS: Dict[str, Any] = {}
+    
     def __init__(self, signal_state: Dict[str, Any], local_vars: Optional[Dict[str, float]] = None):
         self.signal_state = signal_state
         self.local_vars = local_vars if local_vars is not None else {}
@@ -611,175 +614,179 @@ class Evaluator:
         # DON'T mark lines here - do it selectively for each node type
         # This prevents marking lines in branches that don't execute
         
-        if node.type == 'NUMBER':
-            return float(node.value)
-        
-        elif node.type == 'VAR':
-            # Local variable lookup
-            name = node.value
-            if name in self.local_vars:
-                return self.local_vars[name]
-            # Special variables
-            if name == 'time':
-                return self.signal_state.get('time', 0.0)
-            if name == 'sample':
-                return self.signal_state.get('sample', 0.0)
+        # One dict lookup per node instead of walking an if/elif chain on node.type
+        handler = self._NODE_HANDLERS.get(node.type)
+        if handler is None:
             return 0.0
+        return handler(self, node)
+    
+    def _eval_number(self, node: ASTNode) -> float:
+        return float(node.value)
+
+    def _eval_var(self, node: ASTNode) -> float:
+        # Local variable lookup
+        name = node.value
+        if name in self.local_vars:
+            return self.local_vars[name]
+        # Special variables
+        if name == 'time':
+            return self.signal_state.get('time', 0.0)
+        if name == 'sample':
+            return self.signal_state.get('sample', 0.0)
+        return 0.0
+
+    def _eval_static_var(self, node: ASTNode) -> float:
+        # Global variable lookup
+        return global_vars.get(node.value, 0.0)
+
+    def _eval_buttonvar(self, node: ASTNode) -> float:
+        # Button variable lookup (read-only from frontend)
+        button_vars = self.signal_state.get('buttonVars', {})
+        return float(button_vars.get(node.value, 0.0))
+
+    def _eval_assign(self, node: ASTNode) -> float:
+        # Local assignment
+        value = self.eval_node(node.children[0])
+        self.local_vars[node.value] = value
+        # Mark this assignment line as executed
+        for line_num in range(node.line_start, node.line_end + 1):
+            self.executed_lines.add(line_num)
+        return value
+
+    def _eval_static_assign(self, node: ASTNode) -> float:
+        # Global assignment
+        value = self.eval_node(node.children[0])
+        global_vars.set(node.value, value)
+        # Mark this assignment line as executed
+        for line_num in range(node.line_start, node.line_end + 1):
+            self.executed_lines.add(line_num)
+        return value
+
+    def _eval_do_assign(self, node: ASTNode) -> float:
+        # Digital output assignment: "DO:name" = value
+        value = self.eval_node(node.children[0])
+        signal_name = node.value
+        
+        # Find DO channel by name
+        do_list = self.signal_state.get('do_list', [])
+        for i, sig in enumerate(do_list):
+            if sig.get('name') == signal_name:
+                # Queue the hardware write
+                self.hardware_writes.append({
+                    'type': 'do',
+                    'channel': i,
+                    'value': bool(value >= 1.0)  # Convert to boolean
+                })
+                break
         
-        elif node.type == 'STATIC_VAR':
-            # Global variable lookup
-            return global_vars.get(node.value, 0.0)
-        
-        elif node.type == 'BUTTONVAR':
-            # Button variable lookup (read-only from frontend)
-            button_vars = self.signal_state.get('buttonVars', {})
-            return float(button_vars.get(node.value, 0.0))
-        
-        elif node.type == 'ASSIGN':
-            # Local assignment
-            value = self.eval_node(node.children[0])
-            self.local_vars[node.value] = value
-            # Mark this assignment line as executed
-            for line_num in range(node.line_start, node.line_end + 1):
-                self.executed_lines.add(line_num)
-            return value
-        
-        elif node.type == 'STATIC_ASSIGN':
-            # Global assignment
-            value = self.eval_node(node.children[0])
-            global_vars.set(node.value, value)
-            # Mark this assignment line as executed
-            for line_num in range(node.line_start, node.line_end + 1):
-                self.executed_lines.add(line_num)
-            return value
-        
-        elif node.type == 'DO_ASSIGN':
-            # Digital output assignment: "DO:name" = value
-            value = self.eval_node(node.children[0])
-            signal_name = node.value
-            
-            # Find DO channel by name
-            do_list = self.signal_state.get('do_list', [])
-            for i, sig in enumerate(do_list):
-                if sig.get('name') == signal_name:
-                    # Queue the hardware write
-                    self.hardware_writes.append({
-                        'type': 'do',
-                        'channel': i,
-                        'value': bool(value >= 1.0)  # Convert to boolean
-                    })
-                    break
-            
-            return value
-        
-        elif node.type == 'AO_ASSIGN':
-            # Analog output assignment: "AO:name" = value
-            value = self.eval_node(node.children[0])
-            signal_name = node.value
-            
-            # Find AO channel by name
-            ao_list = self.signal_state.get('ao_list', [])
-            for i, sig in enumerate(ao_list):
-                if sig.get('name') == signal_name:
-                    # Queue the hardware write
-                    self.hardware_writes.append({
-                        'type': 'ao',
-                        'channel': i,
-                        'value': float(value)
-                    })
-                    break
-            
-            return value
-        
-        elif node.type == 'SIGNAL':
-            # Signal reference: "AI:Tank"
-            return self.resolve_signal(node.value)
-        
-        elif node.type == 'SIGNAL_PROP':
-            # Signal property: "PID:Motor".OUT
-            signal_ref, prop = node.value
-            return self.resolve_signal_property(signal_ref, prop)
-        
-        elif node.type == 'PLUS':
-            return self.eval_node(node.children[0]) + self.eval_node(node.children[1])
-        
-        elif node.type == 'MINUS':
-            return self.eval_node(node.children[0]) - self.eval_node(node.children[1])
-        
-        elif node.type == 'MULT':
-            return self.eval_node(node.children[0]) * self.eval_node(node.children[1])
-        
-        elif node.type == 'DIV':
-            right = self.eval_node(node.children[1])
-            if right == 0:
-                return 0.0  # Avoid division by zero
-            return self.eval_node(node.children[0]) / right
-        
-        elif node.type == 'MOD':
-            right = self.eval_node(node.children[1])
-            if right == 0:
-                return 0.0
-            return self.eval_node(node.children[0]) % right
-        
-        elif node.type == 'NEGATE':
-            return -self.eval_node(node.children[0])
+        return value
+
+    def _eval_ao_assign(self, node: ASTNode) -> float:
+        # Analog output assignment: "AO:name" = value
+        value = self.eval_node(node.children[0])
+        signal_name = node.value
+        
+        # Find AO channel by name
+        ao_list = self.signal_state.get('ao_list', [])
+        for i, sig in enumerate(ao_list):
+            if sig.get('name') == signal_name:
+                # Queue the hardware write
+                self.hardware_writes.append({
+                    'type': 'ao',
+                    'channel': i,
+                    'value': float(value)
+                })
+                break
         
-        elif node.type == 'COMPARE':
-            left = self.eval_node(node.children[0])
-            right = self.eval_node(node.children[1])
-            op = node.value
-            
-            if op == '<': return 1.0 if left < right else 0.0
-            elif op == '<=': return 1.0 if left <= right else 0.0
-            elif op == '>': return 1.0 if left > right else 0.0
-            elif op == '>=': return 1.0 if left >= right else 0.0
-            elif op == '==': return 1.0 if abs(left - right) < 1e-9 else 0.0
-            elif op == '!=': return 1.0 if abs(left - right) >= 1e-9 else 0.0
+        return value
+
+    def _eval_signal(self, node: ASTNode) -> float:
+        # Signal reference: "AI:Tank"
+        return self.resolve_signal(node.value)
+
+    def _eval_signal_prop(self, node: ASTNode) -> float:
+        # Signal property: "PID:Motor".OUT
+        signal_ref, prop = node.value
+        return self.resolve_signal_property(signal_ref, prop)
+
+    def _eval_plus(self, node: ASTNode) -> float:
+        return self.eval_node(node.children[0]) + self.eval_node(node.children[1])
+
+    def _eval_minus(self, node: ASTNode) -> float:
+        return self.eval_node(node.children[0]) - self.eval_node(node.children[1])
+
+    def _eval_mult(self, node: ASTNode) -> float:
+        return self.eval_node(node.children[0]) * self.eval_node(node.children[1])
+
+    def _eval_div(self, node: ASTNode) -> float:
+        right = self.eval_node(node.children[1])
+        if right == 0:
+            return 0.0  # Avoid division by zero
+        return self.eval_node(node.children[0]) / right
+
+    def _eval_mod(self, node: ASTNode) -> float:
+        right = self.eval_node(node.children[1])
+        if right == 0:
             return 0.0
-        
-        elif node.type == 'AND':
-            left = self.eval_node(node.children[0])
-            right = self.eval_node(node.children[1])
-            return 1.0 if (left != 0.0 and right != 0.0) else 0.0
-        
-        elif node.type == 'OR':
-            left = self.eval_node(node.children[0])
-            right = self.eval_node(node.children[1])
-            return 1.0 if (left != 0.0 or right != 0.0) else 0.0
-        
-        elif node.type == 'NOT':
-            value = self.eval_node(node.children[0])
-            return 1.0 if value == 0.0 else 0.0
-        
-        elif node.type == 'BLOCK':
-            # Evaluate multiple statements in sequence, return last value
-            result = 0.0
-            for stmt in node.children:
-                result = self.eval_node(stmt)
-            return result
-        
-        elif node.type == 'IF':
-            condition = self.eval_node(node.children[0])
-            # Track which branch was taken (store by node position as a simple key)
-            if_key = id(node)  # Unique ID for this IF node
-            if condition != 0.0:
-                self.branch_paths[if_key] = 'then'
-                return self.eval_node(node.children[1])  # THEN
-            else:
-                self.branch_paths[if_key] = 'else'
-                return self.eval_node(node.children[2])  # ELSE
-        
-        elif node.type == 'CALL':
-            # Function call
-            func_name = node.value.lower()
-            if func_name not in self.FUNCTIONS:
-                raise ValueError(f"Unknown function: {func_name}")
-            
-            args = [self.eval_node(arg) for arg in node.children]
-            return self.FUNCTIONS[func_name](*args)
-        
+        return self.eval_node(node.children[0]) % right
+
+    def _eval_negate(self, node: ASTNode) -> float:
+        return -self.eval_node(node.children[0])
+
+    def _eval_compare(self, node: ASTNode) -> float:
+        left = self.eval_node(node.children[0])
+        right = self.eval_node(node.children[1])
+        op = node.value
+        
+        if op == '<': return 1.0 if left < right else 0.0
+        elif op == '<=': return 1.0 if left <= right else 0.0
+        elif op == '>': return 1.0 if left > right else 0.0
+        elif op == '>=': return 1.0 if left >= right else 0.0
+        elif op == '==': return 1.0 if abs(left - right) < 1e-9 else 0.0
+        elif op == '!=': return 1.0 if abs(left - right) >= 1e-9 else 0.0
         return 0.0
-    
+
+    def _eval_and(self, node: ASTNode) -> float:
+        left = self.eval_node(node.children[0])
+        right = self.eval_node(node.children[1])
+        return 1.0 if (left != 0.0 and right != 0.0) else 0.0
+
+    def _eval_or(self, node: ASTNode) -> float:
+        left = self.eval_node(node.children[0])
+        right = self.eval_node(node.children[1])
+        return 1.0 if (left != 0.0 or right != 0.0) else 0.0
+
+    def _eval_not(self, node: ASTNode) -> float:
+        value = self.eval_node(node.children[0])
+        return 1.0 if value == 0.0 else 0.0
+
+    def _eval_block(self, node: ASTNode) -> float:
+        # Evaluate multiple statements in sequence, return last value
+        result = 0.0
+        for stmt in node.children:
+            result = self.eval_node(stmt)
+        return result
+
+    def _eval_if(self, node: ASTNode) -> float:
+        condition = self.eval_node(node.children[0])
+        # Track which branch was taken (store by node position as a simple key)
+        if_key = id(node)  # Unique ID for this IF node
+        if condition != 0.0:
+            self.branch_paths[if_key] = 'then'
+            return self.eval_node(node.children[1])  # THEN
+        else:
+            self.branch_paths[if_key] = 'else'
+            return self.eval_node(node.children[2])  # ELSE
+
+    def _eval_call(self, node: ASTNode) -> float:
+        # Function call
+        func_name = node.value.lower()
+        if func_name not in self.FUNCTIONS:
+            raise ValueError(f"Unknown function: {func_name}")
+        
+        args = [self.eval_node(arg) for arg in node.children]
+        return self.FUNCTIONS[func_name](*args)
+
     def resolve_signal(self, signal_ref: str) -> float:
         """Resolve signal reference using cached indices (OPTIMIZED)"""
         # Try cache first (FAST PATH - O(1) dictionary lookup)
@@ -972,6 +979,34 @@ class Evaluator:
         return 0.0
 
 
+# Dispatch table for Evaluator.eval_node
+Evaluator._NODE_HANDLERS.update({
+    'NUMBER': Evaluator._eval_number,
+    'VAR': Evaluator._eval_var,
+    'STATIC_VAR': Evaluator._eval_static_var,
+    'BUTTONVAR': Evaluator._eval_buttonvar,
+    'ASSIGN': Evaluator._eval_assign,
+    'STATIC_ASSIGN': Evaluator._eval_static_assign,
+    'DO_ASSIGN': Evaluator._eval_do_assign,
+    'AO_ASSIGN': Evaluator._eval_ao_assign,
+    'SIGNAL': Evaluator._eval_signal,
+    'SIGNAL_PROP': Evaluator._eval_signal_prop,
+    'PLUS': Evaluator._eval_plus,
+    'MINUS': Evaluator._eval_minus,
+    'MULT': Evaluator._eval_mult,
+    'DIV': Evaluator._eval_div,
+    'MOD': Evaluator._eval_mod,
+    'NEGATE': Evaluator._eval_negate,
+    'COMPARE': Evaluator._eval_compare,
+    'AND': Evaluator._eval_and,
+    'OR': Evaluator._eval_or,
+    'NOT': Evaluator._eval_not,
+    'BLOCK': Evaluator._eval_block,
+    'IF': Evaluator._eval_if,
+    'CALL': Evaluator._eval_call,
+})
+
+
 def evaluate_expression(expr_text: str, signal_state: Dict[str, Any]) -> Tuple[float, Dict[str, float], List[Dict], Dict[int, str], set]:
     """
     Evaluate an expression and return (result, local_vars, hardware_writes, branch_paths, executed_lines)
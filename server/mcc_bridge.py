@@ -3,6 +3,12 @@ __version__ = "3.0.2"  # Added read_ai_all_burst with board_filter parameter
 BRIDGE_VERSION = "2.0.6"  # Fixed missing imports
 
 import asyncio
+import ctypes
+import heapq
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
 
 
@@ -14,40 +20,69 @@ try:
         ULRange,
         DigitalPortType,
         AnalogInputMode,
+        ScanOptions,
         TempScale as MCCTempScale,
     )
+    from mcculw.ul import ULError
     HAVE_MCCULW = True
 except Exception as e:
     ul = None  # type: ignore
     HAVE_MCCULW = False
     print(f"[MCCBridge] mcculw import failed: {e}")
 
-# ---------- Try ULDAQ (E-TC preferred path) ----------
+# ---------- ULDAQ (E-TC preferred path), imported lazily ----------
+# Only E-TC boards use ULDAQ, and on Windows the import probes for libuldaq and fails
+# slowly, so it is deferred to the first open() that has an enabled E-TC board.
 HAVE_ULDAQ = False
 HAVE_ULDAQ_CFG = False
-try:
-    import uldaq
-    from uldaq import (
-        get_daq_device_inventory,
-        DaqDevice,
-        InterfaceType,
-        TempScale,
-        TInFlags,
-        ThermocoupleType,
-    )
-    HAVE_ULDAQ = True
+_ULDAQ_LOADED = False
+ThermocoupleType = None  # type: ignore
+TInListFlags = None  # type: ignore
+
+
+def _load_uldaq():
+    """Import uldaq once and populate the module-level ULDAQ names/flags"""
+    global _ULDAQ_LOADED, HAVE_ULDAQ, HAVE_ULDAQ_CFG, TInListFlags, ConfigItem
+    global get_daq_device_inventory, DaqDevice, InterfaceType, TempScale, TInFlags, ThermocoupleType
+    global _CFG_ITEM_TC, _TC_MAP_ULDAQ, _TC_MAP_ULDAQ_ACTIVE, _ULDAQ_CFG_OK
+    if _ULDAQ_LOADED:
+        return HAVE_ULDAQ
+    _ULDAQ_LOADED = True
     try:
-        from uldaq import ConfigItem  # some builds expose this
-        HAVE_ULDAQ_CFG = True
-    except Exception:
+        import uldaq
+        from uldaq import (
+            get_daq_device_inventory,
+            DaqDevice,
+            InterfaceType,
+            TempScale,
+            TInFlags,
+            ThermocoupleType,
+        )
+        HAVE_ULDAQ = True
+        TInListFlags = getattr(uldaq, "TInListFlags", None)  # for t_in_list (not on all builds)
+        try:
+            from uldaq import ConfigItem  # some builds expose this
+            HAVE_ULDAQ_CFG = True
+        except Exception:
+            HAVE_ULDAQ_CFG = False
+    except Exception as e:
+        # On Windows this usually fails because libuldaq.so/.dll isn't present
+        HAVE_ULDAQ = False
         HAVE_ULDAQ_CFG = False
-except Exception as e:
-    # On Windows this usually fails because libuldaq.so/.dll isn't present
-    HAVE_ULDAQ = False
-    HAVE_ULDAQ_CFG = False
-    # Define a stub so _TC_MAP_ULDAQ construction doesn't crash
-    ThermocoupleType = None  # type: ignore
-    print(f"[MCCBridge] uldaq import failed: {e}")
+        print(f"[MCCBridge] uldaq import failed: {e}")
+        return False
+
+    # ConfigItem name for the TC sensor type varies across ULDAQ builds - resolve once
+    if HAVE_ULDAQ_CFG:
+        _CFG_ITEM_TC = (
+            getattr(ConfigItem, "TEMP_SENSOR_TYPE", None)
+            or getattr(ConfigItem, "TEMPERATURE_SENSOR_TYPE", None)
+        )
+    _TC_MAP_ULDAQ = {k: getattr(ThermocoupleType, k, None) for k in _TC_MAP_ULDAQ}
+    _TC_MAP_ULDAQ_ACTIVE = {k: v for k, v in _TC_MAP_ULDAQ.items() if v is not None}
+    # TC types can be written through the ULDAQ config API
+    _ULDAQ_CFG_OK = HAVE_ULDAQ_CFG and _CFG_ITEM_TC is not None
+    return True
 
 # Optional MCC thermocouple enum (not on all installs)
 MCCTcType = None
@@ -59,17 +94,35 @@ if HAVE_MCCULW:
 
 from app_models import AppConfig
 
+log = logging.getLogger("mcc_bridge")
+
+# ConfigItem for the TC sensor type (set by _load_uldaq)
+_CFG_ITEM_TC = None
+
+# Uncalibrated ±10 V DAC mapping for _dac_counts: (code at 0 V + 0.5 rounding, codes per volt)
+_AO_CAL_DEFAULT = (65535.0 / 2.0 + 0.5, 65535.0 / 20.0)
+
+# Buzz edges due within this window of the current one are toggled in the same timer callback
+_BUZZ_COALESCE_S = 0.0005
+
+# Consecutive a_in_scan failures before a board gives up its scan buffer for good
+# (until the next open()); fewer are treated as transient USB errors
+_AI_SCAN_MAX_FAILS = 3
+
+
+def _cbw_function(name: str, *argtypes):
+    """Private ctypes prototype (int result) for a function in mcculw's loaded UL DLL.
+    Attribute access on the DLL returns the function pointer mcculw itself calls, so
+    setting argtypes there would change its binding; this builds our own instead.
+    """
+    from mcculw.ul import _cbw  # the loaded cbw32/cbw64 DLL
+    functype = getattr(ctypes, "WINFUNCTYPE", ctypes.CFUNCTYPE)  # stdcall on Windows
+    return functype(ctypes.c_int, *argtypes)((name, _cbw))
+
+
 # ---------- TC type maps ----------
-_TC_MAP_ULDAQ = {
-    "J": ThermocoupleType.J if HAVE_ULDAQ and ThermocoupleType else None,
-    "K": ThermocoupleType.K if HAVE_ULDAQ and ThermocoupleType else None,
-    "T": ThermocoupleType.T if HAVE_ULDAQ and ThermocoupleType else None,
-    "E": ThermocoupleType.E if HAVE_ULDAQ and ThermocoupleType else None,
-    "N": ThermocoupleType.N if HAVE_ULDAQ and ThermocoupleType else None,
-    "B": ThermocoupleType.B if HAVE_ULDAQ and ThermocoupleType else None,
-    "R": ThermocoupleType.R if HAVE_ULDAQ and ThermocoupleType else None,
-    "S": ThermocoupleType.S if HAVE_ULDAQ and ThermocoupleType else None,
-}
+# ULDAQ enums are filled in by _load_uldaq()
+_TC_MAP_ULDAQ = dict.fromkeys(("J", "K", "T", "E", "N", "B", "R", "S"))
 
 _TC_MAP_MCC = {
     "J": getattr(MCCTcType, "J", None) if MCCTcType else None,
@@ -82,8 +135,17 @@ _TC_MAP_MCC = {
     "S": getattr(MCCTcType, "S", None) if MCCTcType else None,
 }
 
+# Only the types the loaded driver actually provides; a missing key means "can't set"
+_TC_MAP_ULDAQ_ACTIVE = {k: v for k, v in _TC_MAP_ULDAQ.items() if v is not None}
+_TC_MAP_MCC_ACTIVE = {k: v for k, v in _TC_MAP_MCC.items() if v is not None}
+
+# TC types can be written through the ULDAQ config API (set by _load_uldaq)
+_ULDAQ_CFG_OK = False
+
 
 class AIFrame:
+    __slots__ = ("vals",)
+
     def __init__(self, vals: List[float]):
         self.vals = vals
 
@@ -96,12 +158,42 @@ class MCCBridge:
         self._boards_1608 = []  # List of E-1608 board numbers
         self._boards_etc_uldaq = []  # List of (board_num, dev, tdev) tuples for ULDAQ
         self._boards_etc_mcc = []  # List of E-TC board numbers for mcculw
+        self._uldaq_cfg_handles = {}  # board_num -> dev.get_config() for ULDAQ E-TC
+        # TC read plan, rebuilt by open(): (base, board_num, tdev, channels) / (base, board_num, channels)
+        self._tc_plan_uldaq = ()
+        self._tc_plan_mcc = ()
+        self._tc_bulk_uldaq = False  # tdev.t_in_list available on every ULDAQ board
+        self._tc_bulk_mcc = False    # ul.t_in_scan available
+        self._tc_bulk_failed = set()  # board_nums whose bulk read failed: per-channel from then on
 
         # AO/DO soft mirrors - sized dynamically based on board count
         self._do_bits = []  # num_1608_boards * 8
+        self._do_tuple = ()  # Immutable snapshot of _do_bits, rebuilt only on change
+        self._do_words = []  # Physical AUXPORT word per board (written with d_out)
+        self._do_written = []  # Last word d_out accepted per board, None = unknown (rewrite)
+        self._do_gen = []  # Per board, bumped whenever its _do_words entry changes
+        self._do_flushing = []  # Per board, True while one thread owns its d_out
+        # DO writes arrive from the event loop, the request threadpool and the I/O thread;
+        # guards the mirrors and words only, never held across d_out
+        self._do_lock = threading.Lock()
         self._ao_vals = []  # num_1608_boards * 2
+        self._ao_tuple = ()  # Immutable snapshot of _ao_vals, rebuilt only on change
         self._do_active_high = []
-        self._buzz_tasks = {}
+        # Buzzing DOs: index -> {"half_period", "on", "board_idx", "bit"}, driven by one timer
+        self._buzz_state = {}
+        self._buzz_handle: Optional[asyncio.TimerHandle] = None  # one call_later chain for all channels
+        self._buzz_heap = []  # (due, seq, index, state); stale entries are skipped lazily
+        self._buzz_seq = 0
+        # AO calibration per board: board_num -> (code at 0 V + 0.5, codes per volt)
+        self._ao_cal = {}
+        # AI conversion per board: board_num -> (volts per count, volts at count 0)
+        self._ai_cal = {}
+        # AO scan buffers per board: board_num -> (memhandle, ushort*) for 2 points
+        self._ao_scan_bufs = {}
+        # AI scan buffers per board: board_num -> (memhandle, ushort*) for channels 0..7
+        self._ai_scan_bufs = {}
+        self._ai_scan_lock = threading.Lock()  # one scan buffer per board, shared by callers
+        self._ai_scan_fails = {}  # board_num -> consecutive a_in_scan failures
 
         # TC type cache - now indexed by global channel index
         self._tc_type_set_cache = {}  # global_ch -> "K"/"J"/...
@@ -109,6 +201,25 @@ class MCCBridge:
         self._tc_detected = False
         self._tc_runtime_include = {}  # global_ch -> bool
 
+        # Raw cbAIn from the UL DLL (skips the ul.a_in wrapper), bound in open()
+        self._cb_a_in = None
+        # Raw cbTInScan + the OPENCONNECTION code, bound in open() (see _t_in_scan_mcc)
+        self._cb_t_in_scan = None
+        self._ul_open_connection = None
+        # Per-channel AI reads are overlapped on this pool (ul.a_in releases the GIL);
+        # created on first use, i.e. only once some board has no a_in_scan buffer
+        self._ai_pool: Optional[ThreadPoolExecutor] = None
+        # Single worker so async callers never stall the event loop on a USB call,
+        # and their driver calls stay serialized in submission order
+        self._io_exec = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mcc-io")
+
+        # Hot-path warning rate limiting: key -> last emit time (monotonic)
+        self._warn_last = {}
+
+        # One-shot AI diagnostics
+        self._ai_debug_done = False
+        self._mcculw_warn_done = False
+
     # ---------------- Lifecycle ----------------
     def open(self, cfg: AppConfig):
         """Open and configure ALL enabled boards"""
@@ -118,6 +229,13 @@ class MCCBridge:
         self._boards_1608 = []
         self._boards_etc_uldaq = []
         self._boards_etc_mcc = []
+        self._uldaq_cfg_handles = {}
+        self._ao_cal = {}
+        self._ai_cal = {}
+        self._ao_scan_bufs = {}
+        self._ai_scan_bufs = {}
+        self._ai_scan_fails = {}
+        do_active_high = []  # per DO channel, from each board's normallyOpen
         
         # === Configure ALL E-1608 boards ===
         if cfg.boards1608:
@@ -127,6 +245,10 @@ class MCCBridge:
                     
                 board_num = board_cfg.boardNum
                 self._boards_1608.append(board_num)
+                dos = board_cfg.digitalOutputs
+                do_active_high.extend(
+                    bool(dos[ch].normallyOpen) if ch < len(dos) else True for ch in range(8)
+                )
                 
                 if HAVE_MCCULW:
                     try:
@@ -139,23 +261,82 @@ class MCCBridge:
                     try:
                         mode = (
                             AnalogInputMode.SINGLE_ENDED
-                            if str(board_cfg.aiMode).upper().startswith("SE")
+                            if board_cfg.ai_single_ended
                             else AnalogInputMode.DIFFERENTIAL
                         )
                         ul.a_input_mode(board_num, mode)
                         print(f"[MCCBridge] E-1608 #{board_num}: AI mode -> {mode.name}")
                     except Exception as e:
                         print(f"[MCCBridge] E-1608 #{board_num}: AI mode warn: {e}")
+
+                    try:
+                        # to_eng_units is linear for BIP10VOLTS: probe it once so
+                        # read_ai_all converts counts with a multiply-add
+                        v_lo = ul.to_eng_units(board_num, ULRange.BIP10VOLTS, 0)
+                        v_hi = ul.to_eng_units(board_num, ULRange.BIP10VOLTS, 65535)
+                        self._ai_cal[board_num] = ((v_hi - v_lo) / 65535.0, v_lo)
+                    except Exception as e:
+                        print(f"[MCCBridge] E-1608 #{board_num}: AI cal warn, using to_eng_units: {e}")
+
+                    try:
+                        # Probe the library conversion once at the range ends so
+                        # set_ao doesn't need a from_eng_units call per write
+                        lo = ul.from_eng_units(board_num, ULRange.BIP10VOLTS, -10.0)
+                        hi = ul.from_eng_units(board_num, ULRange.BIP10VOLTS, 10.0)
+                        per_volt = (float(hi) - float(lo)) / 20.0
+                        # Fold the -10 V origin and the +0.5 rounding into one offset
+                        self._ao_cal[board_num] = (float(lo) + 10.0 * per_volt + 0.5, per_volt)
+                        print(f"[MCCBridge] E-1608 #{board_num}: AO cal -> {lo}..{hi}")
+                    except Exception as e:
+                        print(f"[MCCBridge] E-1608 #{board_num}: AO cal warn, using math: {e}")
+
+                    try:
+                        # 2-point buffer so both DACs can be written in one a_out_scan
+                        memhandle = ul.win_buf_alloc(2)
+                        if memhandle:
+                            buf = ctypes.cast(memhandle, ctypes.POINTER(ctypes.c_ushort))
+                            self._ao_scan_bufs[board_num] = (memhandle, buf)
+                    except Exception as e:
+                        print(f"[MCCBridge] E-1608 #{board_num}: AO scan buffer warn: {e}")
+
+                    try:
+                        # 8-point buffer so one a_in_scan reads channels 0..7
+                        memhandle = ul.win_buf_alloc(8)
+                        if memhandle:
+                            buf = ctypes.cast(memhandle, ctypes.POINTER(ctypes.c_ushort))
+                            self._ai_scan_bufs[board_num] = (memhandle, buf)
+                    except Exception as e:
+                        print(f"[MCCBridge] E-1608 #{board_num}: AI scan buffer warn: {e}")
         
         num_1608 = len(self._boards_1608)
         print(f"[MCCBridge] Configured {num_1608} E-1608 board(s)")
+
+        if HAVE_MCCULW and num_1608 and self._cb_a_in is None:
+            try:
+                # int cbAIn(int BoardNum, int Chan, int Gain, USHORT *DataValue)
+                self._cb_a_in = _cbw_function(
+                    "cbAIn", ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                    ctypes.POINTER(ctypes.c_ushort))
+            except Exception as e:
+                print(f"[MCCBridge] Raw cbAIn unavailable, using ul.a_in: {e}")
         
         # Initialize DO/AO mirrors for all boards
+        self._do_active_high = do_active_high
         self._do_bits = [0] * (num_1608 * 8)
+        self._do_words = [0] * num_1608
+        self._do_written = [None] * num_1608
+        self._do_gen = [0] * num_1608
+        self._do_flushing = [False] * num_1608
+        for board_idx, board_num in enumerate(self._boards_1608):
+            self._seed_do_word(board_idx, board_num)
+        self._do_tuple = tuple(self._do_bits)
         self._ao_vals = [0.0] * (num_1608 * 2)
-        self._do_active_high = [True] * (num_1608 * 8)
+        self._ao_tuple = tuple(self._ao_vals)
         
         # === Configure ALL E-TC boards ===
+        inv = None
+        if cfg.boardsetc and any(b.enabled for b in cfg.boardsetc):
+            _load_uldaq()
         if cfg.boardsetc:
             for board_cfg in cfg.boardsetc:
                 if not board_cfg.enabled:
@@ -167,15 +348,19 @@ class MCCBridge:
                 opened_uldaq = False
                 if HAVE_ULDAQ:
                     try:
-                        inv = get_daq_device_inventory(InterfaceType.ETHERNET)
-                        if not inv:
-                            inv = get_daq_device_inventory(InterfaceType.ANY)
+                        if inv is None:
+                            inv = self._uldaq_inventory()  # once per open(), not per board
                         if inv and 0 <= board_num < len(inv):
                             dev = DaqDevice(inv[board_num])
                             dev.connect()
                             tdev = dev.get_temp_device()
                             if tdev is not None:
                                 self._boards_etc_uldaq.append((board_num, dev, tdev))
+                                if _ULDAQ_CFG_OK:
+                                    try:
+                                        self._uldaq_cfg_handles[board_num] = dev.get_config()
+                                    except Exception as e:
+                                        print(f"[MCCBridge] E-TC #{board_num}: ULDAQ config handle warn: {e}")
                                 print(f"[MCCBridge] E-TC #{board_num}: opened via ULDAQ")
                                 opened_uldaq = True
                     except Exception as e:
@@ -199,18 +384,129 @@ class MCCBridge:
         total_etc = len(self._boards_etc_uldaq) + len(self._boards_etc_mcc)
         print(f"[MCCBridge] Configured {total_etc} E-TC board(s)")
 
+        if self._boards_etc_mcc and self._cb_t_in_scan is None:
+            try:
+                from mcculw.enums import ErrorCode
+                self._ul_open_connection = int(ErrorCode.OPEN_CONNECTION)
+                # int cbTInScan(int BoardNum, int LowChan, int HighChan, int Scale,
+                #               float *DataBuffer, int Options)
+                self._cb_t_in_scan = _cbw_function(
+                    "cbTInScan", ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                    ctypes.POINTER(ctypes.c_float), ctypes.c_int)
+            except Exception as e:
+                print(f"[MCCBridge] Raw cbTInScan unavailable, using ul.t_in_scan: {e}")
+
+        # ULDAQ reads take no TC type (t_in's third argument is TInFlags), so push the
+        # configured types to the device once through its config handle
+        etc_cfg = {}
+        for b in cfg.boardsetc or ():
+            if b.enabled:
+                etc_cfg.setdefault(b.boardNum, b)
+        for pos, (board_num, _, _) in enumerate(self._boards_etc_uldaq):
+            for rec in etc_cfg[board_num].thermocouples:
+                if 0 <= int(rec.ch) < 8:
+                    self._set_tc_type(pos * 8 + int(rec.ch), rec.type)
+
+        self._build_tc_plan()
+        if total_etc:
+            self._detect_tcs()
+
+    async def open_async(self, cfg: AppConfig):
+        """open() on a worker thread so device probing doesn't stall the event loop"""
+        await asyncio.to_thread(self.open, cfg)
+
+    # ---------------- Async wrappers (run on the dedicated I/O thread) ----------------
+    def _io_executor(self) -> ThreadPoolExecutor:
+        if self._io_exec is None:
+            self._io_exec = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mcc-io")
+        return self._io_exec
+
+    def submit_io(self, fn, *args):
+        """Fire-and-forget a blocking driver call on the I/O thread (for non-async callers)"""
+        return self._io_executor().submit(fn, *args)
+
+    async def _run_io(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        if kwargs:
+            return await loop.run_in_executor(self._io_executor(), lambda: fn(*args, **kwargs))
+        return await loop.run_in_executor(self._io_executor(), fn, *args)
+
+    async def aread_ai_all(self, board_filter: Optional[List[int]] = None):
+        return await self._run_io(self.read_ai_all, board_filter)
+
+    async def aread_tc_all(self):
+        return await self._run_io(self.read_tc_all)
+
+    async def aset_do(self, index: int, state: bool, active_high: bool = True):
+        return await self._run_io(self.set_do, index, state, active_high=active_high)
+
+    async def aset_ao(self, index: int, volts: float):
+        return await self._run_io(self.set_ao, index, volts)
+
+    def _uldaq_inventory(self, timeout: float = 2.0):
+        """Probe ETHERNET and ANY inventories concurrently; prefer ETHERNET.
+        Startup waits for the slowest single probe instead of the sum.
+        """
+        ex = ThreadPoolExecutor(max_workers=2, thread_name_prefix="uldaq-inv-")
+        try:
+            futs = [
+                ex.submit(get_daq_device_inventory, InterfaceType.ETHERNET),
+                ex.submit(get_daq_device_inventory, InterfaceType.ANY),
+            ]
+            for fut in futs:
+                try:
+                    inv = fut.result(timeout=timeout)
+                except Exception as e:
+                    print(f"[MCCBridge] ULDAQ inventory probe warn: {e}")
+                    continue
+                if inv:
+                    return inv
+            return []
+        finally:
+            ex.shutdown(wait=False)
+
     def close(self):
         # Ensure DOs off if you want a safe state (optional):
         # for i in range(8): self.set_do(i, False, active_high=True)
-        if self._etc_uldaq_ok and self._etc_uldaq_dev:
+        if self._ai_pool is not None:
+            self._ai_pool.shutdown(wait=False)
+            self._ai_pool = None
+        if self._buzz_handle is not None:
+            self._buzz_handle.cancel()
+            self._buzz_handle = None
+        self._buzz_state = {}
+        self._buzz_heap = []
+        if self._io_exec is not None:
+            self._io_exec.shutdown(wait=True)  # let queued writes land before disconnecting
+            self._io_exec = None
+        for _, dev, _ in self._boards_etc_uldaq:
             try:
-                self._etc_uldaq_dev.disconnect()
+                dev.disconnect()
             except Exception:
                 pass
-        self._etc_uldaq_ok = False
-        self._etc_uldaq_dev = None
-        self._etc_uldaq_tdev = None
-        self._etc_mcc_board = None
+        self._boards_etc_uldaq = []
+        self._boards_etc_mcc = []
+        self._uldaq_cfg_handles = {}
+        self._tc_plan_uldaq = ()
+        self._tc_plan_mcc = ()
+        self._tc_bulk_failed = set()
+        if HAVE_MCCULW:
+            for memhandle, _ in (*self._ao_scan_bufs.values(), *self._ai_scan_bufs.values()):
+                try:
+                    ul.win_buf_free(memhandle)
+                except Exception:
+                    pass
+        self._ao_scan_bufs = {}
+        self._ai_scan_bufs = {}
+
+    def _warn(self, key: str, msg: str):
+        """Log a hot-path warning at most once per second per key.
+        Keeps a failing driver (e.g. unplugged USB) from flooding stdout from tight loops.
+        """
+        now = time.monotonic()
+        if now - self._warn_last.get(key, float("-inf")) >= 1.0:
+            self._warn_last[key] = now
+            log.warning(msg)
 
     # ---------------- Analog Inputs (E-1608) ----------------
     def read_ai_all(self, board_filter=None):
@@ -220,39 +516,106 @@ class MCCBridge:
         Args:
             board_filter: Optional list of board numbers to read from. If None, reads all boards.
         """
-        all_values = []
-        
-        boards_to_read = board_filter if board_filter is not None else self._boards_1608
-        
-        for board_num in boards_to_read:
-            if board_num not in self._boards_1608:
-                continue  # Skip boards not in our list
-                
-            board_values = [0.0] * 8  # Default if read fails
-            
-            if HAVE_MCCULW:
-                try:
-                    # Read all 8 channels from this board
-                    for ch in range(8):
-                        raw = ul.a_in(board_num, ch, ULRange.BIP10VOLTS)  # Raw counts
-                        val = ul.to_eng_units(board_num, ULRange.BIP10VOLTS, raw)  # Convert to volts
-                        board_values[ch] = val
-                    # Debug first read only
-                    if not hasattr(self, '_ai_debug_done'):
-                        print(f"[MCCBridge] Board #{board_num} AI read OK: {board_values[:4]}...")
-                        self._ai_debug_done = True
-                except Exception as e:
-                    print(f"[MCCBridge] E-1608 #{board_num} AI read FAILED: {e}")
-            else:
-                if not hasattr(self, '_mcculw_warn_done'):
-                    print(f"[MCCBridge] WARNING: HAVE_MCCULW=False, returning zeros!")
-                    self._mcculw_warn_done = True
-            
-            all_values.extend(board_values)
+        boards_1608 = self._boards_1608
+        boards_to_read = board_filter if board_filter is not None else boards_1608
+        boards_to_read = [b for b in boards_to_read if b in boards_1608]  # Skip boards not in our list
+
+        # One zero-filled frame for all boards; reads fill it in place (0.0 if a read fails)
+        all_values = [0.0] * (8 * len(boards_to_read))
+
+        # No driver: nothing to read, so skip the per-board loop entirely
+        if not HAVE_MCCULW:
+            if not self._mcculw_warn_done:
+                print(f"[MCCBridge] WARNING: HAVE_MCCULW=False, returning zeros!")
+                self._mcculw_warn_done = True
+            return all_values
+
+        read_one = self._read_one_ai
+        scan_bufs = self._ai_scan_bufs
+
+        for base, board_num in zip(range(0, len(all_values), 8), boards_to_read):
+            try:
+                if board_num in scan_bufs and self._scan_ai_board(board_num, all_values, base):
+                    pass  # One USB transaction for all 8 channels
+                else:
+                    # No a_in_scan for this board: overlap the 8 blocking reads
+                    # instead of paying 8 serial round-trips
+                    pool = self._ai_pool
+                    if pool is None:
+                        with self._ai_scan_lock:  # burst and I/O threads may both get here first
+                            if self._ai_pool is None:
+                                self._ai_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ai-")
+                            pool = self._ai_pool
+                    futs = [pool.submit(read_one, board_num, ch) for ch in range(8)]
+                    all_values[base:base + 8] = [f.result() for f in futs]
+                # Debug first read only
+                if not self._ai_debug_done:
+                    print(f"[MCCBridge] Board #{board_num} AI read OK: {all_values[base:base + 4]}...")
+                    self._ai_debug_done = True
+            except Exception as e:
+                self._warn(f"ai_read_{board_num}", f"[MCCBridge] E-1608 #{board_num} AI read FAILED: {e}")
         
         # Returns [board0_ch0-7, board1_ch0-7, board2_ch0-7, ...]
         return all_values
 
+    def _scan_ai_board(self, board_num: int, out: list, base: int) -> bool:
+        """Read channels 0..7 of one board with a single a_in_scan into out[base:base+8].
+        On failure False is returned and the caller reads per channel this time.
+        After _AI_SCAN_MAX_FAILS failures in a row the board's scan buffer is
+        dropped, so later calls go straight to per-channel reads.
+        """
+        memhandle, buf = self._ai_scan_bufs[board_num]
+        rng = ULRange.BIP10VOLTS
+        try:
+            with self._ai_scan_lock:
+                # 8 points at 10 kHz per channel -> ~0.1 ms of acquisition
+                ul.a_in_scan(board_num, 0, 7, 8, 10000, rng, memhandle, ScanOptions.FOREGROUND)
+                counts = buf[:8]
+        except Exception as e:
+            fails = self._ai_scan_fails[board_num] = self._ai_scan_fails.get(board_num, 0) + 1
+            if fails < _AI_SCAN_MAX_FAILS:
+                self._warn(f"ai_scan_{board_num}",
+                           f"[MCCBridge] E-1608 #{board_num}: a_in_scan failed ({fails}/{_AI_SCAN_MAX_FAILS}), "
+                           f"per-channel read this time: {e}")
+                return False
+            # Under the scan lock so no other thread is mid-scan on the buffer, and
+            # only the thread that removes it frees it
+            with self._ai_scan_lock:
+                if self._ai_scan_bufs.pop(board_num, None) is None:
+                    return False
+                print(f"[MCCBridge] E-1608 #{board_num}: a_in_scan unavailable, using per-channel reads: {e}")
+                try:
+                    ul.win_buf_free(memhandle)
+                except Exception:
+                    pass
+            return False
+        if self._ai_scan_fails:
+            self._ai_scan_fails.pop(board_num, None)  # a good scan ends the failure run
+
+        cal = self._ai_cal.get(board_num)
+        if cal is not None:
+            scale, offset = cal
+            out[base:base + 8] = [c * scale + offset for c in counts]
+        else:
+            out[base:base + 8] = [ul.to_eng_units(board_num, rng, c) for c in counts]
+        return True
+
+    def _read_one_ai(self, board_num: int, ch: int) -> float:
+        """Read one E-1608 AI channel in volts (runs on the AI pool)"""
+        cb_a_in = self._cb_a_in
+        if cb_a_in is not None:
+            raw_buf = ctypes.c_ushort()
+            err = cb_a_in(board_num, ch, int(ULRange.BIP10VOLTS), ctypes.byref(raw_buf))
+            if err:
+                raise ULError(err)
+            raw = raw_buf.value
+        else:
+            raw = ul.a_in(board_num, ch, ULRange.BIP10VOLTS)
+        cal = self._ai_cal.get(board_num)
+        if cal is not None:
+            return raw * cal[0] + cal[1]
+        return ul.to_eng_units(board_num, ULRange.BIP10VOLTS, raw)
+
     def read_ai_all_burst(self, rate_hz: int = 100, samples: int = 50, board_filter=None):
         """
         Read multiple samples in burst mode using hardware scan
@@ -266,6 +629,12 @@ class MCCBridge:
         Returns:
             List of samples, each sample is list of AI values
         """
+        # No driver: every sample is the same zero frame, so build the block
+        # directly instead of going through read_ai_all once per sample
+        if not HAVE_MCCULW:
+            zero = self.read_ai_all(board_filter=board_filter)
+            return [zero[:] for _ in range(samples)]
+
         # For now, just do fast sequential reads
         # TODO: Implement proper ul.a_in_scan for true burst mode
         burst_data = []
@@ -275,38 +644,30 @@ class MCCBridge:
         return burst_data
 
     def _set_tc_type(self, ch: int, typ: str):
-        """Set TC type for channel. ULDAQ only - mcculw uses InstaCal configuration."""
+        """Set TC type for global TC channel. ULDAQ only - mcculw uses InstaCal configuration."""
         t = (typ or "K").upper()
+        board_pos, board_ch = divmod(ch, 8)
         
-        # ULDAQ path (if config API present)
-        if (
-            self._etc_uldaq_ok
-            and HAVE_ULDAQ
-            and HAVE_ULDAQ_CFG
-            and self._etc_uldaq_dev is not None
-        ):
+        # ULDAQ path (config handle and ConfigItem resolved once in open())
+        if board_pos < len(self._boards_etc_uldaq):
+            board_num = self._boards_etc_uldaq[board_pos][0]
+            # Handles only exist when _ULDAQ_CFG_OK, so one lookup covers the driver checks
+            cfg_handle = self._uldaq_cfg_handles.get(board_num)
+            if cfg_handle is None or t not in _TC_MAP_ULDAQ_ACTIVE:
+                return False
+            tc_enum = _TC_MAP_ULDAQ_ACTIVE[t]
             try:
-                tc_enum = _TC_MAP_ULDAQ.get(t)
-                if tc_enum is not None:
-                    # ConfigItem name varies across builds
-                    try:
-                        self._etc_uldaq_dev.get_config().set_cfg(
-                            ConfigItem.TEMP_SENSOR_TYPE, ch, tc_enum
-                        )  # type: ignore
-                    except Exception:
-                        self._etc_uldaq_dev.get_config().set_cfg(
-                            ConfigItem.TEMPERATURE_SENSOR_TYPE, ch, tc_enum
-                        )  # type: ignore
-                    self._tc_type_set_cache[ch] = t
-                    print(f"[MCCBridge] TC{ch} type SET to '{t}' via ULDAQ")
-                    return True
+                cfg_handle.set_cfg(_CFG_ITEM_TC, board_ch, tc_enum)  # type: ignore
+                self._tc_type_set_cache[ch] = t
+                print(f"[MCCBridge] TC{ch} type SET to '{t}' via ULDAQ")
+                return True
             except Exception as e:
                 print(f"[MCCBridge] ULDAQ set TC{ch} type '{t}' FAILED: {e}")
                 return False
 
         # mcculw path: TC types are configured in InstaCal, not via API
         # We just cache the expected type for reference but don't set it
-        if HAVE_MCCULW and self._etc_mcc_board is not None:
+        if HAVE_MCCULW and board_pos - len(self._boards_etc_uldaq) < len(self._boards_etc_mcc):
             self._tc_type_set_cache[ch] = t
             # Don't print warning every time - just note it once during init
             return True
@@ -314,79 +675,195 @@ class MCCBridge:
         # No TC hardware available
         return False
 
+    def _build_tc_plan(self):
+        """Resolve which channels to read on each opened E-TC board, once per open().
+        Global TC layout matches read_tc_all: ULDAQ boards first, then mcculw boards.
+        """
+        included = {}  # board_num -> sorted tuple of included channels
+        if self.cfg and self.cfg.boardsetc:
+            for b in self.cfg.boardsetc:
+                if b.enabled and b.boardNum not in included:
+                    included[b.boardNum] = tuple(sorted({
+                        int(rec.ch) for rec in b.thermocouples
+                        if rec.include and 0 <= int(rec.ch) < 8
+                    }))
+        # Per board: (board_num, tdev, low, high, chs, slots, offs), where
+        # chs/slots/offs are parallel tuples (channel, output index, offset into
+        # the low..high bulk result) so reads iterate plain ints, no lookups
+        def soa(base, channels):
+            low = channels[0] if channels else 0
+            high = channels[-1] if channels else 0
+            return (low, high, channels,
+                    tuple(base + ch for ch in channels),
+                    tuple(ch - low for ch in channels))
+        self._tc_plan_uldaq = tuple(
+            (board_num, tdev, *cols)
+            for pos, (board_num, _, tdev) in enumerate(self._boards_etc_uldaq)
+            for cols in (soa(pos * 8, included.get(board_num, ())),)
+            if cols[2]
+        )
+        # Bulk reads cover low..high of the planned channels in one transaction
+        self._tc_bulk_uldaq = TInListFlags is not None and all(
+            hasattr(tdev, "t_in_list") for _, _, tdev in self._boards_etc_uldaq
+        )
+        self._tc_bulk_mcc = HAVE_MCCULW and hasattr(ul, "t_in_scan")
+        self._tc_bulk_failed = set()
+        n_uldaq = len(self._boards_etc_uldaq)
+        self._tc_plan_mcc = tuple(
+            (board_num, *cols)
+            for pos, board_num in enumerate(self._boards_etc_mcc)
+            for cols in (soa((n_uldaq + pos) * 8, included.get(board_num, ())),)
+            if cols[2]
+        )
+
+    def _t_in_scan_mcc(self, board_num: int, low: int, high: int):
+        """ul.t_in_scan for CELSIUS, except that an open-connection error still returns
+        the data: the UL fills open channels with -9999 and reports OPENCONNECTION for
+        the whole scan, which the ul wrapper turns into an exception with no data.
+        """
+        cb = self._cb_t_in_scan
+        if cb is None:
+            return ul.t_in_scan(board_num, low, high, MCCTempScale.CELSIUS)
+        data = (ctypes.c_float * (high - low + 1))()
+        err = cb(board_num, low, high, int(MCCTempScale.CELSIUS), data, 0)
+        if err and err != self._ul_open_connection:
+            raise ULError(err)
+        return data
+
+    def _detect_tcs(self):
+        """Flag which TC inputs have a sensor attached: one 0..7 range read per board,
+        a channel counts as present when it returns a plausible temperature.
+        Per-channel probing is only used for a board whose range read fails. On mcculw
+        boards open inputs just read -9999 (see _t_in_scan_mcc); ULDAQ's t_in_list
+        raises for any open input, so there the range read only helps fully wired boards.
+        """
+        def plausible(v):
+            return -200.0 < v < 2000.0  # False for nan and the -9999 open-circuit code
+
+        def probe(base, bulk, single):
+            try:
+                vals = bulk()
+                for ch in range(8):
+                    self._tc_runtime_include[base + ch] = plausible(vals[ch])
+                return
+            except Exception:
+                pass
+            for ch in range(8):
+                try:
+                    self._tc_runtime_include[base + ch] = plausible(single(ch))
+                except Exception:
+                    self._tc_runtime_include[base + ch] = False
+
+        self._tc_runtime_include = {}
+        for pos, (board_num, _, tdev) in enumerate(self._boards_etc_uldaq):
+            probe(pos * 8,
+                  lambda: tdev.t_in_list(0, 7, TempScale.CELSIUS, TInListFlags.DEFAULT),
+                  lambda ch: tdev.t_in(ch, TempScale.CELSIUS, TInFlags.DEFAULT))
+        n_uldaq = len(self._boards_etc_uldaq)
+        for pos, board_num in enumerate(self._boards_etc_mcc):
+            probe((n_uldaq + pos) * 8,
+                  lambda: self._t_in_scan_mcc(board_num, 0, 7),
+                  lambda ch: ul.t_in(board_num, ch, MCCTempScale.CELSIUS))
+        self._tc_detected = True
+        found = sorted(ch for ch, present in self._tc_runtime_include.items() if present)
+        print(f"[MCCBridge] TC detection: sensors on {found or 'no channels'}")
+
     def read_tc_all(self):
         """Read TC from ALL E-TC boards, return concatenated list"""
-        all_values = []
+        n_boards = len(self._boards_etc_uldaq) + len(self._boards_etc_mcc)
+        all_values = [float('nan')] * (8 * n_boards)
         
-        # Get TC configs from all boards
-        tc_configs = []
-        if self.cfg and self.cfg.boardsetc:
-            for board in self.cfg.boardsetc:
-                if board.enabled:
-                    tc_configs.extend(board.thermocouples)
+        # A board whose bulk read fails once (e.g. an open or unwired input anywhere in
+        # low..high) is read per channel from then on, so later reads don't pay for a
+        # failed scan first. open() rebuilds the plan and retries bulk.
+        bulk_failed = self._tc_bulk_failed
         
         # Read from ULDAQ boards
-        for board_num, dev, tdev in self._boards_etc_uldaq:
-            board_values = [float('nan')] * 8
-            try:
-                # Get which TCs are configured for this board
-                board_tcs = []
-                if self.cfg and self.cfg.boardsetc:
-                    for b in self.cfg.boardsetc:
-                        if b.boardNum == board_num and b.enabled:
-                            board_tcs = b.thermocouples
-                            break
-                
-                # Read each configured TC
-                configured_channels = {int(rec.ch): rec for rec in board_tcs}
-                for ch in range(8):
-                    if ch in configured_channels and configured_channels[ch].include:
-                        rec = configured_channels[ch]
-                        tc_type_str = rec.type.upper()
-                        tc_type_enum = getattr(TcType, tc_type_str, TcType.K)
-                        temp_val = tdev.t_in(ch, TempScale.CELSIUS, tc_type_enum)
-                        board_values[ch] = temp_val
-            except Exception as e:
-                print(f"[MCCBridge] E-TC #{board_num} ULDAQ read failed: {e}")
-            
-            all_values.extend(board_values)
+        for board_num, tdev, low, high, chs, slots, offs in self._tc_plan_uldaq:
+            if self._tc_bulk_uldaq and board_num not in bulk_failed:
+                try:
+                    # One transaction for the whole low..high channel range
+                    vals = tdev.t_in_list(low, high, TempScale.CELSIUS, TInListFlags.DEFAULT)
+                    for slot, off in zip(slots, offs):
+                        all_values[slot] = vals[off]
+                    continue
+                except Exception as e:
+                    bulk_failed.add(board_num)
+                    print(f"[MCCBridge] E-TC #{board_num} ULDAQ list read failed, reading per channel: {e}")
+            # Read each configured TC (type comes from the device config, see open())
+            for slot, ch in zip(slots, chs):
+                try:
+                    all_values[slot] = tdev.t_in(ch, TempScale.CELSIUS, TInFlags.DEFAULT)
+                except Exception as e:
+                    # Open circuit is common, leave as nan
+                    self._warn(f"tc_uldaq_{board_num}_{ch}", f"[MCCBridge] E-TC #{board_num} ch{ch} ULDAQ read failed: {e}")
         
         # Read from mcculw boards
-        for board_num in self._boards_etc_mcc:
-            board_values = [float('nan')] * 8
-            try:
-                # Get which TCs are configured for this board
-                board_tcs = []
-                if self.cfg and self.cfg.boardsetc:
-                    for b in self.cfg.boardsetc:
-                        if b.boardNum == board_num and b.enabled:
-                            board_tcs = b.thermocouples
-                            break
-                
-                # Read each configured TC
-                for rec in board_tcs:
-                    if rec.include:
-                        ch = int(rec.ch)
-                        if 0 <= ch < 8:
-                            try:
-                                temp_val = ul.t_in(board_num, ch, MCCTempScale.CELSIUS)
-                                board_values[ch] = temp_val
-                            except Exception:
-                                # Open circuit is common, leave as nan
-                                pass
-            except Exception as e:
-                print(f"[MCCBridge] E-TC #{board_num} mcculw read failed: {e}")
-            
-            all_values.extend(board_values)
+        if self._tc_plan_mcc:
+            t_in = ul.t_in
+            celsius = MCCTempScale.CELSIUS
+        for board_num, low, high, chs, slots, offs in self._tc_plan_mcc:
+            if self._tc_bulk_mcc and board_num not in bulk_failed:
+                try:
+                    vals = self._t_in_scan_mcc(board_num, low, high)
+                    for slot, off in zip(slots, offs):
+                        v = vals[off]
+                        # Open circuit reads back as -9999; keep it nan like the per-channel path
+                        all_values[slot] = v if v > -9999.0 else float('nan')
+                    continue
+                except Exception as e:
+                    # e.g. open-connection error for the whole scan: read singly below
+                    bulk_failed.add(board_num)
+                    print(f"[MCCBridge] E-TC #{board_num} scan read failed, reading per channel: {e}")
+            # Read each configured TC
+            for slot, ch in zip(slots, chs):
+                try:
+                    all_values[slot] = t_in(board_num, ch, celsius)
+                except Exception:
+                    # Open circuit is common, leave as nan
+                    pass
         
         # Returns [board0_ch0-7, board1_ch0-7, ...]
         return all_values
 
+    def _seed_do_word(self, board_idx: int, board_num: int):
+        """Start one board's cached AUXPORT word from the port itself, or failing that
+        from each channel's configured idle level (physical 1 when wired active-low),
+        so a later whole-word write never energizes an output nobody set.
+        Nothing is written here.
+        """
+        base = board_idx * 8
+        inverted = 0
+        for ch in range(8):
+            if not self._do_active_high[base + ch]:
+                inverted |= 1 << ch
+        word = None
+        if HAVE_MCCULW:
+            try:
+                word = int(ul.d_in(board_num, DigitalPortType.AUXPORT)) & 0xFF
+                self._do_written[board_idx] = word  # the port already holds it
+            except Exception as e:
+                print(f"[MCCBridge] E-1608 #{board_num}: DO read-back warn, using configured idle levels: {e}")
+        if word is None:
+            word = inverted
+        self._do_words[board_idx] = word
+        logical = word ^ inverted
+        for ch in range(8):
+            self._do_bits[base + ch] = (logical >> ch) & 1
+
     def set_do(self, index: int, state: bool, active_high=True):
         """Set DO channel - routes to correct board based on index"""
+        board_idx = self._set_do_bit(index, state, active_high)
+        if board_idx is not None:
+            self._flush_do(board_idx)
+
+    def _set_do_bit(self, index: int, state: bool, active_high=True) -> Optional[int]:
+        """Update DO mirrors and port word without writing hardware.
+        Returns the board index whose word changed, or None if no write is needed.
+        """
         # Safety check
         if self.cfg is None:
-            return
+            return None
         
         # Calculate which board and channel
         board_idx = index // 8  # Which board (0, 1, 2...)
@@ -394,61 +871,185 @@ class MCCBridge:
         
         # Bounds check
         if board_idx >= len(self._boards_1608):
-            print(f"[MCCBridge] DO{index}: board index {board_idx} out of range")
-            return
-        
-        board_num = self._boards_1608[board_idx]
+            self._warn(f"do_range_{index}", f"[MCCBridge] DO{index}: board index {board_idx} out of range")
+            return None
         
-        # Update mirror
-        if index < len(self._do_bits):
-            self._do_bits[index] = 1 if state else 0
         if index < len(self._do_active_high):
             self._do_active_high[index] = bool(active_high)
         
-        # Write to hardware
-        logical = bool(state)
-        phys = 1 if (logical == bool(active_high)) else 0
+        return self._apply_do_mask(board_idx, 1 << channel, (1 if state else 0) << channel)
+
+    def set_do_mask(self, board_idx: int, mask: int, states: int):
+        """Set several DOs of one E-1608 at once with at most one port write.
+        Bit i of mask selects DO board_idx*8+i; the same bit of states is its logical level
+        (mapped through each channel's active_high, as set_do does).
+        """
+        if self.cfg is None:
+            return
+        if board_idx >= len(self._boards_1608):
+            self._warn(f"do_mask_range_{board_idx}", f"[MCCBridge] DO mask: board index {board_idx} out of range")
+            return
+        if self._apply_do_mask(board_idx, mask, states) is not None:
+            self._flush_do(board_idx)
+
+    def _apply_do_mask(self, board_idx: int, mask: int, states: int) -> Optional[int]:
+        """Update DO mirrors and the cached port word for the masked channels of one board.
+        Returns board_idx if the physical word changed (caller flushes), else None.
+        """
+        mask &= 0xFF
+        base = board_idx * 8
+        active_high = self._do_active_high
+        inverted = 0  # channels wired active-low
+        for ch in range(8):
+            if (mask >> ch) & 1:
+                index = base + ch
+                if index < len(active_high) and not active_high[index]:
+                    inverted |= 1 << ch
         
-        if HAVE_MCCULW:
-            try:
-                ul.d_bit_out(board_num, DigitalPortType.AUXPORT, channel, phys)
-            except Exception as e:
-                print(f"[MCCBridge] DO{index} (board #{board_num}, ch{channel}) write failed: {e}")
+        with self._do_lock:
+            do_bits = self._do_bits
+            changed = False
+            for ch in range(8):
+                if not (mask >> ch) & 1:
+                    continue
+                index = base + ch
+                if index < len(do_bits):
+                    bit = (states >> ch) & 1
+                    if do_bits[index] != bit:
+                        do_bits[index] = bit
+                        changed = True
+            if changed:
+                self._do_tuple = tuple(do_bits)
+            
+            # Update physical port word (written by _flush_do)
+            word = self._do_words[board_idx]
+            new_word = (word & ~mask) | ((states ^ inverted) & mask)
+            if new_word != word:
+                self._do_words[board_idx] = new_word
+                self._do_gen[board_idx] += 1
+            if new_word == self._do_written[board_idx]:
+                return None  # Hardware already has this word - skip the port write
+            return board_idx
+
+    def _flush_do(self, board_idx: int):
+        """Write the cached AUXPORT word for one board with a single d_out.
+        The lock only covers the word snapshot, d_out runs outside it so a slow USB
+        write never blocks _apply_do_mask (and so the event loop). One thread writes
+        a board at a time: a flush that finds another in progress returns, and that
+        writer repeats until the word it wrote is still the newest.
+        """
+        board_num = self._boards_1608[board_idx]
+        lock = self._do_lock
+        with lock:
+            if self._do_flushing[board_idx]:
+                return  # the thread writing this board picks up the newer word
+            self._do_flushing[board_idx] = True
+        try:
+            while True:
+                with lock:
+                    word = self._do_words[board_idx]
+                    gen = self._do_gen[board_idx]
+                ok = True
+                if HAVE_MCCULW:
+                    try:
+                        ul.d_out(board_num, DigitalPortType.AUXPORT, word)
+                    except Exception as e:
+                        ok = False
+                        self._warn(f"do_write_{board_num}", f"[MCCBridge] DO port write (board #{board_num}) failed: {e}")
+                with lock:
+                    if ok and self._do_gen[board_idx] == gen:
+                        self._do_written[board_idx] = word
+                        return
+                    # Failed: hardware state unknown, the next set for this board writes again.
+                    # Superseded while writing: loop and send the newer word.
+                    self._do_written[board_idx] = None
+                    if self._do_gen[board_idx] == gen:
+                        return
+        finally:
+            with lock:
+                self._do_flushing[board_idx] = False
 
     async def start_buzz(self, index: int, hz: float, active_high: bool = True):
         self._do_active_high[index] = bool(active_high)
         await self.stop_buzz(index)  # cancel any prior
         period = 1.0 / max(0.1, float(hz))
 
-        async def _worker():
-            on = False
-            try:
-                while True:
-                    on = not on
-                    self.set_do(index, on, active_high=self._do_active_high[index])
-                    await asyncio.sleep(period / 2.0)
-            except asyncio.CancelledError:
-                # guarantee OFF on cancel
-                self.set_do(index, False, active_high=self._do_active_high[index])
-                raise
+        board_idx, channel = divmod(index, 8)
+        if self.cfg is None or board_idx >= len(self._boards_1608):
+            self._warn(f"do_range_{index}", f"[MCCBridge] DO{index}: board index {board_idx} out of range")
+            return
+
+        loop = asyncio.get_running_loop()
+        st = self._buzz_state[index] = {
+            "half_period": period / 2.0,
+            "on": False,
+            # Resolved once so each edge is a single masked word update
+            "board_idx": board_idx,
+            "bit": 1 << channel,
+        }
+        self._buzz_push(loop.time(), index, st)
+        self._buzz_arm(loop, 0.0)  # first edge on the next loop pass
 
-        self._buzz_tasks[index] = asyncio.create_task(_worker())
+    def _buzz_push(self, due: float, index: int, st: dict):
+        self._buzz_seq += 1
+        heapq.heappush(self._buzz_heap, (due, self._buzz_seq, index, st))
+
+    def _buzz_arm(self, loop, delay: float):
+        """(Re)schedule the single buzz timer callback"""
+        if self._buzz_handle is not None:
+            self._buzz_handle.cancel()
+        self._buzz_handle = loop.call_later(max(0.0, delay), self._buzz_tick)
+
+    def _buzz_tick(self):
+        """Timer callback toggling every due buzzing DO; one port write per board, then re-arm.
+        Runs on the event loop; port writes go to the I/O thread so a slow USB call never stalls it.
+        """
+        self._buzz_handle = None
+        if not self._buzz_state:
+            return
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        # Edges due within the coalescing window share this wakeup (and its port write)
+        horizon = now + _BUZZ_COALESCE_S
+        heap = self._buzz_heap
+        state = self._buzz_state
+        dirty = set()
+        apply_mask = self._apply_do_mask
+        rearm = []
+        while heap and heap[0][0] <= horizon:
+            due, _, index, st = heapq.heappop(heap)
+            if state.get(index) is not st:
+                continue  # channel stopped or restarted since this entry was pushed
+            on = st["on"] = not st["on"]
+            bit = st["bit"]
+            board_idx = apply_mask(st["board_idx"], bit, bit if on else 0)
+            if board_idx is not None:
+                dirty.add(board_idx)
+            half = st["half_period"]
+            due += half
+            rearm.append((due if due >= now else now + half, index, st))  # fell behind, don't burst
+        for due, index, st in rearm:
+            self._buzz_push(due, index, st)
+        io = self._io_executor()
+        for board_idx in dirty:
+            loop.run_in_executor(io, self._flush_do, board_idx)
+
+        if heap:
+            self._buzz_arm(loop, heap[0][0] - loop.time())
 
     async def stop_buzz(self, index: int):
-        t = self._buzz_tasks.pop(index, None)
-        if t:
-            t.cancel()
-            try:
-                await t
-            except asyncio.CancelledError:
-                pass
-            except Exception:
-                pass
-        # double-ensure OFF in case there was no task
-        self.set_do(index, False, active_high=self._do_active_high[index])
+        self._buzz_state.pop(index, None)
+        if not self._buzz_state:
+            self._buzz_heap.clear()
+            if self._buzz_handle is not None:
+                self._buzz_handle.cancel()
+                self._buzz_handle = None
+        # guarantee OFF (queued behind any in-flight toggle write on the I/O thread)
+        await self.aset_do(index, False, active_high=self._do_active_high[index])
 
     def get_do_snapshot(self):
-        return list(self._do_bits)
+        """Read-only DO state; the same tuple is returned until a bit changes"""
+        return self._do_tuple
 
     # ---------------- Analog Outputs (E-1608) ----------------
     @property
@@ -459,38 +1060,20 @@ class MCCBridge:
     def _dac_counts(self, volts: float, board_num: int) -> int:
         """Convert volts to 16-bit DAC code for ±10 V range (BIP10V).
         Clamps to [-10.0, +10.0], returns integer in [0, 65535].
+        Uses the per-board calibration probed in open(), else plain math.
         """
         try:
             v = float(volts)
         except Exception:
             v = 0.0
-        # Clamp to device range
-        if v < -10.0:
-            v = -10.0
-        if v > +10.0:
-            v = +10.0
-
-        # Preferred: library conversion (handles calibration)
-        if HAVE_MCCULW and ul is not None:
-            try:
-                return int(
-                    ul.from_eng_units(
-                        board_num,
-                        ULRange.BIP10VOLTS,
-                        v,
-                    )
-                )
-            except Exception as e:
-                print(f"[MCCBridge] from_eng_units failed, using math: {e}")
+        # Clamp to device range (conditional expressions, no min/max calls)
+        v = -10.0 if v < -10.0 else (10.0 if v > 10.0 else v)
 
-        # Fallback math: map [-10, +10] -> [0, 65535]
-        # LSB ≈ 20 V / 65535 ≈ 0.000305 V
-        code = int(round((v + 10.0) * (65535.0 / 20.0)))
-        if code < 0:
-            code = 0
-        if code > 65535:
-            code = 65535
-        return code
+        # Map [-10, +10] -> [lo, hi] with one multiply-add; the offset already holds
+        # the +10 V shift and the rounding half-LSB (fallback: [0, 65535])
+        offset, per_volt = self._ao_cal.get(board_num, _AO_CAL_DEFAULT)
+        code = int(offset + v * per_volt)
+        return 0 if code < 0 else (65535 if code > 65535 else code)
 
     def set_ao(self, index: int, voltage: float):
         """Set AO channel - routes to correct board based on index"""
@@ -504,28 +1087,105 @@ class MCCBridge:
         
         # Bounds check
         if board_idx >= len(self._boards_1608):
-            print(f"[MCCBridge] AO{index}: board index {board_idx} out of range")
+            self._warn(f"ao_range_{index}", f"[MCCBridge] AO{index}: board index {board_idx} out of range")
             return
         
         board_num = self._boards_1608[board_idx]
         voltage = float(voltage)
         
         # Update mirror
-        if index < len(self._ao_vals):
+        if index < len(self._ao_vals) and self._ao_vals[index] != voltage:
             self._ao_vals[index] = voltage
+            self._ao_tuple = tuple(self._ao_vals)
         
-        # Convert to DAC counts
-        code = self._dac_counts(voltage, board_num)
+        # No driver: the mirror above is all there is, skip the DAC conversion entirely
+        if not HAVE_MCCULW:
+            return
         
-        # Write to hardware
-        if HAVE_MCCULW:
-            try:
-                ul.a_out(board_num, channel, ULRange.BIP10VOLTS, int(code))
-            except Exception as e:
-                print(f"[MCCBridge] AO{index} (board #{board_num}, ch{channel}) write failed: {e}")
+        # Convert to DAC counts and write to hardware
+        code = self._dac_counts(voltage, board_num)
+        try:
+            ul.a_out(board_num, channel, ULRange.BIP10VOLTS, code)
+        except Exception as e:
+            self._warn(f"ao_write_{index}", f"[MCCBridge] AO{index} (board #{board_num}, ch{channel}) write failed: {e}")
+
+    def set_ao_pair(self, board_idx: int, v0: float, v1: float):
+        """Set both AO channels of one E-1608 in a single a_out_scan.
+        Falls back to two set_ao calls if the scan buffer or scan is unavailable.
+        """
+        if self.cfg is None:
+            return
+
+        if board_idx >= len(self._boards_1608):
+            self._warn(f"ao_pair_range_{board_idx}", f"[MCCBridge] AO pair: board index {board_idx} out of range")
+            return
+
+        board_num = self._boards_1608[board_idx]
+        scan_buf = self._ao_scan_bufs.get(board_num)
+        if not HAVE_MCCULW or scan_buf is None:
+            self.set_ao(board_idx * 2, v0)
+            self.set_ao(board_idx * 2 + 1, v1)
+            return
+
+        v0 = float(v0)
+        v1 = float(v1)
+        index = board_idx * 2
+        if index + 1 < len(self._ao_vals):
+            self._ao_vals[index] = v0
+            self._ao_vals[index + 1] = v1
+            self._ao_tuple = tuple(self._ao_vals)
+
+        memhandle, buf = scan_buf
+        buf[0] = self._dac_counts(v0, board_num)
+        buf[1] = self._dac_counts(v1, board_num)
+        try:
+            ul.a_out_scan(board_num, 0, 1, 2, 1000, ULRange.BIP10VOLTS,
+                          memhandle, ScanOptions.FOREGROUND)
+        except Exception as e:
+            self._warn(f"ao_pair_scan_{board_num}", f"[MCCBridge] AO pair (board #{board_num}) scan failed, writing singly: {e}")
+            self.set_ao(index, v0)
+            self.set_ao(index + 1, v1)
+
+    def set_ao_batch(self, channels, values):
+        """Write several AO channels (global indices) in one call.
+        Boards with both channels in the batch get one a_out_scan; the rest use set_ao.
+        A channel listed twice keeps its last value.
+        """
+        per_board = {}  # board_idx -> {channel: volts}
+        for index, volts in zip(channels, values):
+            per_board.setdefault(index // 2, {})[index % 2] = volts
+        for board_idx, chans in per_board.items():
+            if len(chans) == 2:
+                self.set_ao_pair(board_idx, chans[0], chans[1])
+            else:
+                for channel, volts in chans.items():
+                    self.set_ao(board_idx * 2 + channel, volts)
+
+    def set_do_batch(self, channels, states, active_high=True):
+        """Write several DO channels (global indices) with at most one port write per board.
+        A channel listed twice keeps its last state.
+        """
+        if self.cfg is None:
+            return
+        per_board = {}  # board_idx -> [mask, states]
+        for index, state in zip(channels, states):
+            board_idx, channel = divmod(index, 8)
+            if board_idx >= len(self._boards_1608):
+                self._warn(f"do_range_{index}", f"[MCCBridge] DO{index}: board index {board_idx} out of range")
+                continue
+            if index < len(self._do_active_high):
+                self._do_active_high[index] = bool(active_high)
+            bit = 1 << channel
+            entry = per_board.setdefault(board_idx, [0, 0])
+            entry[0] |= bit
+            entry[1] = (entry[1] | bit) if state else (entry[1] & ~bit)
+        for board_idx, (mask, bits) in per_board.items():
+            if self._apply_do_mask(board_idx, mask, bits) is not None:
+                self._flush_do(board_idx)
 
     def get_ao_snapshot(self):
-        return list(self._ao_vals)
+        """Read-only AO state; the same tuple is returned until a value changes"""
+        return self._ao_tuple
 
     def get_tc_configuration_status(self) -> List[dict]:
         """
@@ -556,7 +1216,7 @@ class MCCBridge:
             }
             
             # ULDAQ path - we can verify the type was set
-            if self._etc_uldaq_ok and HAVE_ULDAQ:
+            if self._boards_etc_uldaq and HAVE_ULDAQ:
                 cached = self._tc_type_set_cache.get(ch)
                 status["actual_type"] = cached
                 status["config_method"] = "ULDAQ API"
@@ -564,7 +1224,7 @@ class MCCBridge:
                     status["needs_config"] = True
             
             # mcculw path - we can't read the type, just inform user
-            elif HAVE_MCCULW and self._etc_mcc_board is not None:
+            elif HAVE_MCCULW and self._boards_etc_mcc:
                 status["actual_type"] = "Unknown (set in InstaCal)"
                 status["config_method"] = "InstaCal"
                 # Flag detected channels as needing verification since we can't read the type
@@ -11,6 +11,31 @@ import logging
 
 log = logging.getLogger("motor")
 
+
+def _build_modbus_crc_table():
+    """CRC16/MODBUS (poly 0xA001, reflected) remainder for every byte value"""
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            if crc & 0x0001:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc >>= 1
+        table.append(crc)
+    return tuple(table)
+
+
+_MODBUS_CRC_TABLE = _build_modbus_crc_table()
+
+
+def _modbus_crc(data, tbl=_MODBUS_CRC_TABLE) -> int:
+    """MODBUS CRC16 over data (bytes/bytearray/memoryview), table-driven"""
+    crc = 0xFFFF
+    for byte in data:
+        crc = (crc >> 8) ^ tbl[(crc ^ byte) & 0xFF]
+    return crc
+
 class RattmotorYPMC:
     """Interface for Rattmotor YPMC-750W servo controller via MODBUS RS232"""
     
@@ -20,6 +45,13 @@ class RattmotorYPMC:
         self.address = address
         self.serial_port: Optional[serial.Serial] = None
         self.connected = False
+        self._sp_ready = False  # port opened and no I/O error since; avoids is_open per command
+        # Static head of the speed-command frame: [address][0x06][0x2000]
+        self._rpm_prefix = struct.pack(">BBH", address, 0x06, 0x2000)
+        self._last_rpm_value: Optional[int] = None  # last speed register value acknowledged
+        # Reply buffer reused for every transaction (filled by readinto)
+        self._resp_buf = bytearray(8)
+        self._resp_mv = memoryview(self._resp_buf)
         
     def connect(self):
         """Open serial connection"""
@@ -30,70 +62,84 @@ class RattmotorYPMC:
                 bytesize=serial.EIGHTBITS,
                 parity=serial.PARITY_NONE,
                 stopbits=serial.STOPBITS_ONE,
-                timeout=1.0
+                timeout=0.1,              # 8-byte reply at 9600 baud is ~8 ms on the wire
+                inter_byte_timeout=0.01   # return early once the reply frame stops arriving
             )
             self.connected = True
+            self._sp_ready = True
+            self._last_rpm_value = None
             log.info(f"Connected to motor controller on {self.port}")
             return True
         except Exception as e:
             log.error(f"Failed to connect to {self.port}: {e}")
             self.connected = False
+            self._sp_ready = False
             return False
     
     def disconnect(self):
         """Close serial connection"""
+        self._sp_ready = False
         if self.serial_port and self.serial_port.is_open:
             self.serial_port.close()
             self.connected = False
+            self._last_rpm_value = None
             log.info(f"Disconnected from {self.port}")
     
+    def _reconnect(self) -> bool:
+        """Reopen the port once after an I/O error; no-op if never connected"""
+        if not self.connected:
+            return False
+        try:
+            self.serial_port.close()
+        except Exception:
+            pass
+        return self.connect()
+    
     def _calculate_crc(self, data: bytes) -> int:
-        """Calculate MODBUS CRC16"""
-        crc = 0xFFFF
-        for byte in data:
-            crc ^= byte
-            for _ in range(8):
-                if crc & 0x0001:
-                    crc = (crc >> 1) ^ 0xA001
-                else:
-                    crc >>= 1
-        return crc
+        """Calculate MODBUS CRC16 (table-driven, one lookup per byte)"""
+        return _modbus_crc(data)
     
     def _send_command(self, function_code: int, register: int, value: int) -> bool:
         """Send MODBUS RTU command"""
-        if not self.serial_port or not self.serial_port.is_open:
+        if not self._sp_ready and not self._reconnect():
             log.error("Serial port not open")
             return False
         
         # Build MODBUS frame: [address][function][register_hi][register_lo][value_hi][value_lo]
-        frame = bytearray([
-            self.address,
-            function_code,
-            (register >> 8) & 0xFF,
-            register & 0xFF,
-            (value >> 8) & 0xFF,
-            value & 0xFF
-        ])
-        
-        # Add CRC
-        crc = self._calculate_crc(frame)
-        frame.append(crc & 0xFF)
-        frame.append((crc >> 8) & 0xFF)
+        head = struct.pack(">BBHH", self.address, function_code, register & 0xFFFF, value & 0xFFFF)
         
+        # Add CRC (low byte first)
+        frame = head + struct.pack("<H", _modbus_crc(head))
+        
+        return self._transact(frame, function_code)
+    
+    def _transact(self, frame: bytes, function_code: int) -> bool:
+        """Write a complete RTU frame and check the echo reply.
+        Any failed exchange (exception, short read, bad echo or CRC) forgets the
+        acknowledged speed, so the next set_rpm is sent even if unchanged.
+        """
+        ok = False
         try:
+            # Drop stale bytes (e.g. a late reply to a timed-out command) so framing stays aligned
+            self.serial_port.reset_input_buffer()
             self.serial_port.write(frame)
-            time.sleep(0.05)  # Small delay for response
             
-            # Read response (8 bytes for typical MODBUS response)
-            response = self.serial_port.read(8)
-            if len(response) >= 6:
-                # Verify response address and function code
-                if response[0] == self.address and response[1] == function_code:
-                    return True
-            return False
+            # Read response (8 bytes for typical MODBUS response); returns as soon as they arrive
+            resp = self._resp_buf
+            n = self.serial_port.readinto(self._resp_mv)
+            # Verify response address, function code and CRC (a corrupt echo is a failed write)
+            ok = (
+                n == 8
+                and resp[0] == self.address
+                and resp[1] == function_code
+                and _modbus_crc(self._resp_mv[:6]) == (resp[6] | (resp[7] << 8))
+            )
         except Exception as e:
             log.error(f"Command failed: {e}")
-            return False
+            self._sp_ready = False  # handle is suspect until the next connect()
+        if not ok:
+            self._last_rpm_value = None  # drive state unknown
+        return ok
     
     def set_rpm(self, rpm: int) -> bool:
         """
@@ -110,16 +156,31 @@ class RattmotorYPMC:
         else:
             value = rpm
         
-        # MODBUS function 0x06 = Write Single Register
-        return self._send_command(0x06, 0x2000, value)
+        # Same speed already acknowledged: skip the serial round trip
+        if value == self._last_rpm_value:
+            return True
+        
+        if not self._sp_ready and not self._reconnect():
+            log.error("Serial port not open")
+            return False
+        
+        # MODBUS function 0x06 = Write Single Register (prefix prebuilt in __init__)
+        frame = self._rpm_prefix + struct.pack(">H", value)
+        frame += struct.pack("<H", _modbus_crc(frame))
+        ok = self._transact(frame, 0x06)  # clears _last_rpm_value on failure
+        if ok:
+            self._last_rpm_value = value
+        return ok
     
     def enable_motor(self) -> bool:
         """Enable motor drive"""
         # Register 0x2001 for enable (typical, adjust as needed)
+        self._last_rpm_value = None  # drive may reset its speed register on enable
         return self._send_command(0x06, 0x2001, 0x0001)
     
     def disable_motor(self) -> bool:
         """Disable motor drive"""
+        self._last_rpm_value = None  # resend the speed after a disable/fault/re-enable
         return self._send_command(0x06, 0x2001, 0x0000)
     
     def read_status(self) -> Optional[Dict]:
@@ -148,9 +209,16 @@ class MotorManager:
         baudrate = config.get("baudrate", 9600)
         address = config.get("address", 1)
         
+        # Reuse the open connection when the link settings are unchanged
+        old = self.motors.get(index)
+        if (old is not None and old.connected and old.port == port
+                and old.baudrate == baudrate and old.address == address):
+            self.configs[index] = config
+            return old
+        
         # Disconnect old instance if exists
-        if index in self.motors:
-            self.motors[index].disconnect()
+        if old is not None:
+            old.disconnect()
         
         # Create new instance
         motor = RattmotorYPMC(port, baudrate, address)
@@ -221,8 +289,16 @@ class MotorManager:
             motor.disconnect()
 
 
-def list_serial_ports() -> List[Dict[str, str]]:
-    """List available COM ports"""
+# Port enumeration walks the OS device tree (slow on Windows); UI polls hit this cache
+_PORTS_CACHE = {"ts": 0.0, "val": None}
+_PORTS_TTL = 2.0  # seconds
+
+
+def list_serial_ports(force: bool = False) -> List[Dict[str, str]]:
+    """List available COM ports (cached for _PORTS_TTL s unless force=True)"""
+    now = time.monotonic()
+    if not force and _PORTS_CACHE["val"] is not None and now - _PORTS_CACHE["ts"] < _PORTS_TTL:
+        return _PORTS_CACHE["val"]
     ports = []
     for port in serial.tools.list_ports.comports():
         ports.append({
@@ -230,4 +306,6 @@ def list_serial_ports() -> List[Dict[str, str]]:
             "description": port.description,
             "hwid": port.hwid
         })
+    _PORTS_CACHE["ts"] = now
+    _PORTS_CACHE["val"] = ports
     return ports
@@ -1,8 +1,10 @@
 # server/pid_core.py
-from dataclasses import dataclass
+import logging
+import threading
+from dataclasses import dataclass, fields
 from typing import List, Dict, Optional
 
-@dataclass
+@dataclass(slots=True)  # fixed field set: no per-instance __dict__, offset-based attribute reads
 class LoopDef:
     enabled: bool
     kind: str           # "analog" | "digital" | "var"
@@ -31,294 +33,574 @@ class LoopDef:
     enable_index: int = 0          # Which DO/LE to use as enable
     execution_rate_hz: Optional[float] = None  # None = run at sample rate
 
-class _PID:
-    def __init__(self, d: LoopDef):
-        self.d = d
-        self.i = 0.0
-        self.prev = None
-        self.tick_counter = 0  # For execution rate decimation
-        self.last_u = 0.0      # Last output value (for decimated execution)
-        # Store last telemetry values for skip cycles
-        self.last_pv = 0.0
-        self.last_sp = 0.0
-        self.last_err = 0.0
-        self.last_p = 0.0
-        self.last_d = 0.0
+_LOOP_FIELDS = tuple(f.name for f in fields(LoopDef))  # copied attribute-by-attribute in load()
+
+log = logging.getLogger("pid")
+
+_INF = float("inf")
+_NAN = float("nan")
+
+# Integer codes for the per-loop string selectors (resolved once in load())
+KIND_ANALOG, KIND_DIGITAL, KIND_VAR = 0, 1, 2
+_KIND_CODES = {"analog": KIND_ANALOG, "digital": KIND_DIGITAL, "var": KIND_VAR}
+# Source codes double as indices into step()'s per-tick source table
+SRC_AI, SRC_AO, SRC_TC, SRC_PID, SRC_MATH, SRC_EXPR, SRC_STATIC = 0, 1, 2, 3, 4, 5, 6
+# "static" (expression global variable) is offered by the editor but has no lookup yet: pv = 0.0
+_SRC_CODES = {"ai": SRC_AI, "ao": SRC_AO, "tc": SRC_TC, "pid": SRC_PID, "math": SRC_MATH, "expr": SRC_EXPR,
+              "static": SRC_STATIC}
+SP_FIXED = -1  # setpoint comes from target_arr
+_SP_CODES = {"ao": SRC_AO, "math": SRC_MATH, "expr": SRC_EXPR, "pid": SRC_PID}
+GATE_NONE, GATE_DO, GATE_LE, GATE_MATH, GATE_EXPR = -1, 0, 1, 2, 3
+_GATE_CODES = {"do": GATE_DO, "le": GATE_LE, "math": GATE_MATH, "expr": GATE_EXPR}
+
+
+_STEP_CACHE: Dict[str, object] = {}  # generated source -> compiled step function
+
+
+def _compile_loop_step(kp, ki, kd, err_min, err_max, i_min, i_max):
+    """
+    Build a PID update specialised for one loop's gains. Gains are baked in as
+    literals and clamps for unset (None) bounds are left out entirely, so an
+    unbounded loop pays for no comparisons. The generated function has the form
+    f(pv, sp, dt, inv_dt, k, i_state, prev_state, u_out, e_out, p_out, d_out),
+    stores into slot k of every array it is given (nothing is returned, so no
+    result tuple is built), and expects inv_dt = 1/dt with dt already floored at
+    1e-6. Loops with identical gains share one function.
+    """
+    lines = ["def pid_step(pv, sp, dt, inv_dt, k, i_state, prev_state, u_out, e_out, p_out, d_out):",
+             "    e = sp - pv"]
+    # Same results as max(err_min, e) / min(err_max, e) without the builtin calls
+    if err_min is not None:
+        lines.append(f"    e = e if e > {float(err_min)!r} else {float(err_min)!r}")
+    if err_max is not None:
+        lines.append(f"    e = e if e < {float(err_max)!r} else {float(err_max)!r}")
+    lines.append(f"    i = i_state[k] + {float(ki)!r} * e * dt")
+    if i_min is not None:
+        lines.append(f"    i = i if i > {float(i_min)!r} else {float(i_min)!r}")
+    if i_max is not None:
+        lines.append(f"    i = i if i < {float(i_max)!r} else {float(i_max)!r}")
+    lines += ["    prev = prev_state[k]",
+              f"    d = 0.0 if prev != prev else {float(kd)!r} * (e - prev) * inv_dt  # nan: first step",
+              "    i_state[k] = i",
+              "    prev_state[k] = e",
+              f"    p = {float(kp)!r} * e",
+              "    u_out[k] = p + i + d",
+              "    e_out[k] = e",
+              "    p_out[k] = p",
+              "    d_out[k] = d"]
+    src = "\n".join(lines)
+    fn = _STEP_CACHE.get(src)
+    if fn is None:
+        # repr() of a non-finite float is the bare name inf / -inf / nan (pydantic
+        # accepts e.g. 1e999), so the generated code resolves those names here
+        ns = {"inf": _INF, "nan": _NAN}
+        exec(compile(src, "<pid_step>", "exec"), ns)
+        fn = _STEP_CACHE[src] = ns["pid_step"]
+    return fn
+
+
+def _pid_sweep(idx, pv, sp, dt, inv_dt, step_fns, i_state, prev_state, u_out, e_out, p_out, d_out):
+    """
+    Batch PID update for the loops listed in idx (parallel to pv/sp/dt/inv_dt),
+    calling each loop's specialised step_fns[k] (see _compile_loop_step).
+    Results land in slot k of the caller's preallocated u/err/p/d columns;
+    i_state/prev_state are updated in place (i_state doubles as the i column).
+    """
+    for k, pv_k, sp_k, dt_k, inv_k in zip(idx, pv, sp, dt, inv_dt):
+        step_fns[k](pv_k, sp_k, dt_k, inv_k, k, i_state, prev_state, u_out, e_out, p_out, d_out)
 
-    def step(self, pv: float, sp: float, dt: float):
-        """
-        Execute one PID step
-        pv: process variable (current value)
-        sp: setpoint (target value)
-        dt: time step
-        """
-        e = sp - pv
-        if self.d.err_min is not None: e = max(self.d.err_min, e)
-        if self.d.err_max is not None: e = min(self.d.err_max, e)
-        p = self.d.kp * e
-        self.i += self.d.ki * e * dt
-        if self.d.i_min is not None: self.i = max(self.d.i_min, self.i)
-        if self.d.i_max is not None: self.i = min(self.d.i_max, self.i)
-        d = 0.0
-        if self.prev is not None:
-            d = self.d.kd * (e - self.prev) / max(1e-6, dt)
-        self.prev = e
-        u = p + self.i + d
-        
-        # Store for telemetry during skip cycles
-        self.last_pv = pv
-        self.last_sp = sp
-        self.last_err = e
-        self.last_p = p
-        self.last_d = d
-        
-        return u, e, p, self.i, d  # Return u, error, p_term, i_term, d_term
 
 class PIDManager:
+    """
+    PID loops stored as parallel arrays (one slot per loop, same order as meta).
+    Parameters are rebuilt as tuples in load(); controller state lives in lists
+    that step() mutates in place. Unset bounds are stored as +/-inf and "no
+    previous error" as nan, so the math never has to test for None.
+    """
     def __init__(self):
-        self.loops: List[_PID] = []
         self.meta: List[LoopDef] = []
         self.last_gate_states: List[bool] = []  # Track gate states for change detection
+        # Output writes handed to the bridge I/O thread (see _queue_writes)
+        self._write_lock = threading.Lock()
+        self._pending_writes: Dict[tuple, object] = {}
+        self._write_busy = False
+        # Sample period cache (see _sample_dt)
+        self._rate_hz = 0.0
+        self._period = 0.0
+        self.__dict__.update(self._build_params([]))
+        self.decim_arr = ()
+        self.__dict__.update(self._new_state(0))
+        self.__dict__.update(self._new_telemetry([]))
+
+    @staticmethod
+    def _validate(meta: List[LoopDef]):
+        """Reject loops step() can't run, so the tick path never has to check"""
+        for d in meta:
+            if d.kind not in _KIND_CODES:
+                raise ValueError(f"PID loop '{d.name}': unknown kind '{d.kind}'")
+            if d.src not in _SRC_CODES:
+                raise ValueError(f"PID loop '{d.name}': unknown source '{d.src}'")
+            for field in ("ai_ch", "out_ch", "sp_channel", "enable_index", "out_min_channel", "out_max_channel"):
+                if getattr(d, field) < 0:
+                    raise ValueError(f"PID loop '{d.name}': {field} must be >= 0")
+
+    @staticmethod
+    def _build_params(meta: List[LoopDef]) -> Dict[str, object]:
+        """Per-loop parameters as parallel tuples (read-only between reloads)"""
+        def lo(v, default=-_INF):
+            return default if v is None else float(v)
+
+        def hi(v, default=_INF):
+            return default if v is None else float(v)
+
+        def safe_write(d):
+            # Disabled loops hold their output in the safe state (var kind has no hardware)
+            kind = _KIND_CODES[d.kind]
+            if d.enabled or kind == KIND_VAR:
+                return None
+            if kind == KIND_DIGITAL:
+                return (KIND_DIGITAL, int(d.out_ch), False)  # Force to 0
+            return (KIND_ANALOG, int(d.out_ch), lo(d.out_min, -10.0))  # Force to minimum (typically 0V)
+
+        return {
+            "enabled_mask": tuple(bool(d.enabled) for d in meta),
+            # Enabled loops are the only ones step() visits; disabled ones are fixed
+            # for the life of this config
+            "on_idx": tuple(k for k, d in enumerate(meta) if d.enabled),
+            # Safe-state writes for disabled loops. Loading a config is the only way a
+            # loop becomes disabled, so the first step() after load() issues these once
+            # and drops them; parked outputs aren't re-forced every tick (see step())
+            "safe_writes": [safe_write(d) for d in meta],
+            "kind_code": tuple(_KIND_CODES[d.kind] for d in meta),
+            "src_code": tuple(_SRC_CODES[d.src] for d in meta),
+            "ai_ch_arr": tuple(int(d.ai_ch) for d in meta),
+            "sp_code": tuple(_SP_CODES.get(d.sp_source, SP_FIXED) for d in meta),
+            "sp_ch_arr": tuple(int(d.sp_channel) for d in meta),
+            # pid_prev rows that cascaded loops read (as pv or setpoint); only these
+            # are pulled into the cascade column each tick
+            "pid_refs": tuple(sorted(
+                {int(d.ai_ch) for d in meta if d.enabled and d.src == "pid"}
+                | {int(d.sp_channel) for d in meta if d.enabled and d.sp_source == "pid"}
+            )),
+            "out_ch_arr": tuple(int(d.out_ch) for d in meta),
+            # An unknown gate kind never closes the gate, same as no gate at all
+            "gate_code": tuple(_GATE_CODES.get(d.enable_kind, GATE_NONE) if d.enable_gate else GATE_NONE
+                               for d in meta),
+            "gate_ch_arr": tuple(int(d.enable_index) for d in meta),
+            "uses_gate": frozenset(_GATE_CODES.get(d.enable_kind, GATE_NONE) for d in meta
+                                   if d.enabled and d.enable_gate),
+            # Math channel feeding each dynamic output limit, -1 = fixed
+            "lim_lo_ch": tuple(int(d.out_min_channel) if d.out_min_source == "math" else -1 for d in meta),
+            "lim_hi_ch": tuple(int(d.out_max_channel) if d.out_max_source == "math" else -1 for d in meta),
+            "kp_arr": tuple(float(d.kp) for d in meta),
+            "ki_arr": tuple(float(d.ki) for d in meta),
+            "kd_arr": tuple(float(d.kd) for d in meta),
+            "target_arr": tuple(float(d.target) for d in meta),
+            # Execution rate per loop, 0.0 = every sample
+            "exec_hz_arr": tuple(float(d.execution_rate_hz) if d.execution_rate_hz and d.execution_rate_hz > 0 else 0.0
+                                 for d in meta),
+            "err_min_arr": tuple(lo(d.err_min) for d in meta),
+            "err_max_arr": tuple(hi(d.err_max) for d in meta),
+            "i_min_arr": tuple(lo(d.i_min) for d in meta),
+            "i_max_arr": tuple(hi(d.i_max) for d in meta),
+            "out_min_arr": tuple(lo(d.out_min, -10.0) for d in meta),  # analog default range
+            "out_max_arr": tuple(hi(d.out_max, 10.0) for d in meta),
+            # Per-loop PID update with this config's gains compiled in
+            "step_fns": tuple(
+                _compile_loop_step(d.kp, d.ki, d.kd, d.err_min, d.err_max, d.i_min, d.i_max)
+                for d in meta
+            ),
+        }
+
+    # Controller state arrays, in the order load() carries them across reloads
+    _STATE_KEYS = ("i_arr", "prev_arr", "tick_arr")
+
+    @staticmethod
+    def _new_state(n: int) -> Dict[str, list]:
+        """Fresh controller state for n loops"""
+        return {
+            "i_arr": [0.0] * n,
+            "prev_arr": [_NAN] * n,      # nan = no previous error yet
+            "tick_arr": [0] * n,         # For execution rate decimation
+            # Per-tick sweep outputs (scratch, not carried across reloads)
+            "u_buf": [0.0] * n,
+            "e_buf": [0.0] * n,
+            "p_buf": [0.0] * n,
+            "d_buf": [0.0] * n,
+        }
+
+    @staticmethod
+    def _new_telemetry(meta: List[LoopDef]) -> Dict[str, list]:
+        """
+        Per-loop telemetry dicts, one per shape step() can report. step() overwrites
+        the values in place every tick instead of allocating fresh dicts, so the
+        returned rows are only valid until the next step(); copy them to keep them.
+        """
+        return {
+            # Placeholder rows for disabled loops (None where step() fills the slot)
+            "tel_base": [None if d.enabled else {"name": d.name, "pv": 0.0, "u": 0.0, "out": 0.0, "err": 0.0,
+                                                 "enabled": False} for d in meta],
+            "tel_gated": [{"name": d.name, "pv": 0.0, "u": 0.0, "out": 0.0, "err": 0.0, "enabled": True,
+                           "gated": True, "gate_value": 0.0} for d in meta],
+            "tel_skip": [{"name": d.name, "pv": 0.0, "u": 0.0, "out": 0.0, "err": 0.0, "p_term": 0.0,
+                          "i_term": 0.0, "d_term": 0.0, "target": 0.0, "enabled": True, "gated": False,
+                          "gate_value": 0.0, "skipped": True} for d in meta],
+            "tel_run": [{"name": d.name, "pv": 0.0, "u": 0.0, "out": 0.0, "err": 0.0, "p_term": 0.0,
+                         "i_term": 0.0, "d_term": 0.0, "target": 0.0, "enabled": True, "gated": False,
+                         "gate_value": 0.0} for d in meta],
+        }
+
+    # ---------------- Output writer ----------------
+    def _queue_writes(self, bridge, pending: Dict[tuple, object]):
+        """
+        Merge this tick's {(kind, out_ch): value} writes into the pending set and make
+        sure a drain is scheduled on the bridge's I/O thread, so step() never blocks
+        on USB. If the writer falls behind, later values for a channel overwrite
+        earlier ones (only the latest command matters) and nothing queues up.
+        Bridges without submit_io are written inline.
+        """
+        submit = getattr(bridge, "submit_io", None)
+        if submit is None:
+            self._write_outputs(bridge, pending)
+            return
+        with self._write_lock:
+            self._pending_writes.update(pending)
+            if self._write_busy:
+                return
+            self._write_busy = True
+        submit(self._drain_writes, bridge)
+
+    def _drain_writes(self, bridge):
+        while True:
+            with self._write_lock:
+                pending = self._pending_writes
+                if not pending:
+                    self._write_busy = False
+                    return
+                self._pending_writes = {}
+            self._write_outputs(bridge, pending)
+
+    @staticmethod
+    def _write_outputs(bridge, pending: Dict[tuple, object]):
+        """One batch call per output type"""
+        do_ch, do_val, ao_ch, ao_val = [], [], [], []
+        for (kind, ch), value in pending.items():
+            if kind == KIND_DIGITAL:
+                do_ch.append(ch)
+                do_val.append(value)
+            else:
+                ao_ch.append(ch)
+                ao_val.append(value)
+        # Separate guards so a failed DO write doesn't also drop the AO writes
+        if do_ch:
+            try:
+                bridge.set_do_batch(do_ch, do_val, active_high=True)
+            except Exception as e:
+                log.warning("[PID] DO write failed: %s", e)
+        if ao_ch:
+            try:
+                bridge.set_ao_batch(ao_ch, ao_val)
+            except Exception as e:
+                log.warning("[PID] AO write failed: %s", e)
+
+    def _sample_dt(self, sample_rate_hz: float) -> float:
+        """
+        Seconds per sample: the nominal 1 / sample_rate_hz. step() consumes buffered
+        samples in batches, so wall-clock gaps between calls say nothing about the
+        spacing of the samples themselves. Cached with the decimation per rate.
+        """
+        if sample_rate_hz != self._rate_hz:
+            self._rate_hz = sample_rate_hz
+            self._period = max(1e-6, 1.0 / max(1.0, sample_rate_hz))
+            self.decim_arr = self._decimation(self.exec_hz_arr, sample_rate_hz)
+        return self._period
+
+    @staticmethod
+    def _decimation(exec_hz_arr, sample_rate_hz: float) -> tuple:
+        """Samples per execution for each loop at this rate, 0 = runs every sample."""
+        return tuple(max(1, int(round(sample_rate_hz / hz))) if hz > 0.0 else 0 for hz in exec_hz_arr)
 
     def load(self, pid_file):
         # Preserve existing PID states when reloading config
         # Only reset state on disable/gate, never on parameter changes
-        old_loops = {meta.name: (pid, meta) for pid, meta in zip(self.loops, self.meta)}
+        old_index = {meta.name: k for k, meta in enumerate(self.meta)}
         
-        new_loops = []
-        new_meta = []
-        new_gate_states = []
+        # Read the record's attributes directly instead of dumping it to a dict first
+        new_meta = [LoopDef(*[getattr(rec, f) for f in _LOOP_FIELDS]) for rec in pid_file.loops]
+        self._validate(new_meta)  # raises before anything is swapped
+        new_state = self._new_state(len(new_meta))
         
-        for rec in pid_file.loops:
-            d = LoopDef(**rec.dict())
-            
-            # Check if this PID existed before with same name
-            if d.name in old_loops:
-                old_pid, old_meta = old_loops[d.name]
-                
-                # Update parameters, keep ALL state intact (i, prev)
-                old_pid.d = d
-                
-                new_loops.append(old_pid)
-            else:
-                # New PID - create fresh
-                new_loops.append(_PID(d))
-            
-            new_meta.append(d)
-            new_gate_states.append(True)  # Assume enabled initially
+        # Carry state over for loops that keep their name
+        for key in self._STATE_KEYS:
+            old, new = getattr(self, key), new_state[key]
+            for k, d in enumerate(new_meta):
+                j = old_index.get(d.name)
+                if j is not None:
+                    # Update parameters, keep ALL state intact (i, prev)
+                    new[k] = old[j]
+        
+        # Disabled loops sit at reset state (step() no longer visits them)
+        for k, d in enumerate(new_meta):
+            if not d.enabled:
+                new_state["i_arr"][k] = 0.0
+                new_state["prev_arr"][k] = _NAN
+                new_state["tick_arr"][k] = 0
         
-        # Atomic swap - replace all lists at once
-        self.loops = new_loops
-        self.meta = new_meta
-        self.last_gate_states = new_gate_states
+        # Skip-cycle rows start from the loop's last execution (its old run row);
+        # step() refreshes them whenever a decimated loop executes
+        new_tel = self._new_telemetry(new_meta)
+        old_run = self.tel_run
+        for k, d in enumerate(new_meta):
+            j = old_index.get(d.name)
+            if j is not None:
+                src, t = old_run[j], new_tel["tel_skip"][k]
+                t["pv"] = src["pv"]
+                t["u"] = t["out"] = src["u"]  # skip cycles report u as the output
+                t["err"] = src["err"]
+                t["p_term"] = src["p_term"]
+                t["d_term"] = src["d_term"]
+                t["target"] = src["target"]
+        
+        # Atomic swap - replace all arrays at once (one dict update under the GIL)
+        params = self._build_params(new_meta)
+        self.__dict__.update(
+            params,
+            decim_arr=self._decimation(params["exec_hz_arr"], self._rate_hz),
+            **new_state,
+            **new_tel,
+            meta=new_meta,
+            last_gate_states=[True] * len(new_meta),  # Assume enabled initially
+        )
 
     def step(self, ai_vals: List[float], tc_vals: List[float], bridge, do_state=None, le_state=None, pid_prev=None, math_outputs=None, expr_outputs=None, sample_rate_hz=100.0) -> List[Dict]:
-        import time
-        dt = 1.0 / max(1.0, sample_rate_hz)  # Time step in seconds
-        tel = []
-        for i, (p, d) in enumerate(zip(self.loops, self.meta)):
-            if not d.enabled:
-                # PID disabled via checkbox - reset state and force outputs to safe state
-                p.i = 0.0
-                p.prev = None
-                p.tick_counter = 0
-                
-                # Force outputs to safe state based on kind
-                if d.kind == "digital":
-                    bridge.set_do(d.out_ch, False, active_high=True)  # Force to 0
-                elif d.kind == "analog":
-                    # Force to minimum (typically 0V)
-                    min_val = -10.0 if d.out_min is None else d.out_min
-                    bridge.set_ao(d.out_ch, min_val)
-                # var kind doesn't write to hardware
-                
-                # Add placeholder telemetry for disabled loops to maintain indexing
-                tel.append({"name": d.name, "pv": 0.0, "u": 0.0, "out": 0.0, "err": 0.0, "enabled": False})
-                continue
-                
+        """
+        Run one sample of every loop and queue its output write (see _queue_writes).
+
+        Safe-state contract: a loop's output is forced to its safe state only when
+        the loop's state changes. That is once on the first step() after load() for
+        every disabled loop (DO off, AO to out_min), and once when an enabled loop's
+        gate closes (DO off, AO 0 V). "var" loops have no output to force. A parked
+        output is not re-forced on later ticks, so a manual DO/AO command, an
+        expression or another loop writing the same channel afterwards stays in effect.
+        """
+        base_dt = self._sample_dt(sample_rate_hz)  # Time step in seconds (>= 1e-6)
+        inv_base_dt = 1.0 / base_dt  # shared by every loop running at the sample rate
+        
+        # Parameter/state arrays for this tick (bound once; load() swaps them as a set)
+        meta = self.meta
+        kind_code, src_code = self.kind_code, self.src_code
+        ai_ch_arr, out_ch_arr, sp_code, sp_ch_arr = self.ai_ch_arr, self.out_ch_arr, self.sp_code, self.sp_ch_arr
+        gate_code, gate_ch_arr, lim_lo_ch, lim_hi_ch = self.gate_code, self.gate_ch_arr, self.lim_lo_ch, self.lim_hi_ch
+        target_arr, out_min_arr, out_max_arr = self.target_arr, self.out_min_arr, self.out_max_arr
+        exec_hz_arr, decim_arr = self.exec_hz_arr, self.decim_arr
+        i_arr, prev_arr, tick_arr = self.i_arr, self.prev_arr, self.tick_arr
+        tel_gated, tel_skip, tel_run = self.tel_gated, self.tel_skip, self.tel_run
+        last_gate_states = self.last_gate_states
+        n_gate_states = len(last_gate_states)
+        
+        ao_cache = bridge.ao_cache  # AO mirror, read once per tick
+        tc_buf = tc_vals or ()
+        
+        # Source table indexed by SRC_* code: pv/sp gathers become sources[code][ch]
+        # (pid_prev may be our own reused telemetry rows, so read it before Phase 1)
+        pid_refs = self.pid_refs
+        if pid_prev and pid_refs:
+            n_prev = len(pid_prev)
+            pid_out = [0.0] * n_prev
+            for c in pid_refs:
+                if c < n_prev:
+                    pid_out[c] = pid_prev[c].get("out", 0.0)
+        else:
+            pid_out = ()
+        sources = (ai_vals, ao_cache, tc_buf, pid_out, math_outputs or (), expr_outputs or (), ())
+        source_len = tuple(map(len, sources))  # bounds for every gather, taken once
+        n_math = source_len[SRC_MATH]
+        
+        # Gate table indexed by GATE_* code, every entry as a float gate value (open
+        # when >= 1.0); None = source not supplied this tick, which leaves the gate open.
+        # DO/LE states are lifted to 0.0/1.0 once here rather than per gated loop.
+        uses_gate = self.uses_gate
+        gate_sources = (
+            None if do_state is None else ([1.0 if v else 0.0 for v in do_state] if GATE_DO in uses_gate else ()),
+            None if le_state is None else ([1.0 if s.get("output", False) else 0.0 for s in le_state]
+                                           if GATE_LE in uses_gate else ()),
+            math_outputs,
+            expr_outputs,
+        )
+        gate_len = tuple(0 if g is None else len(g) for g in gate_sources)
+        
+        # Per-loop slots, pre-filled for disabled loops; the phases below fill the rest
+        tel = self.tel_base[:]        # telemetry row per loop
+        writes = self.safe_writes     # at most one hardware write per loop: (kind, out_ch, value)
+        if writes is None:
+            writes = [None] * len(meta)
+        else:
+            self.safe_writes = None   # one-shot, see _build_params
+        # Loops that run the PID this tick (parallel lists)
+        run_k, run_pv, run_sp, run_dt, run_inv, run_gate = [], [], [], [], [], []
+        
+        # ---- Phase 1: enable/gate/decimation bookkeeping and input gather ----
+        # Everything below reads the parallel arrays; meta[k] is only touched for
+        # the loop name on the rare log/error paths
+        for k in self.on_idx:
+            kind = kind_code[k]
+            
             # Check enable gate if configured
             gate_enabled = True
             gate_value = 1.0  # Default gate value when no gate configured
-            if d.enable_gate:
-                if d.enable_kind == "do" and do_state is not None:
-                    if d.enable_index < len(do_state):
-                        gate_value = 1.0 if do_state[d.enable_index] else 0.0
-                        gate_enabled = bool(do_state[d.enable_index])
-                    else:
-                        gate_value = 0.0
-                        gate_enabled = False
-                elif d.enable_kind == "le" and le_state is not None:
-                    if d.enable_index < len(le_state):
-                        gate_value = 1.0 if le_state[d.enable_index].get("output", False) else 0.0
-                        gate_enabled = le_state[d.enable_index].get("output", False)
-                    else:
-                        gate_value = 0.0
-                        gate_enabled = False
-                elif d.enable_kind == "math" and math_outputs is not None:
-                    if d.enable_index < len(math_outputs):
-                        gate_value = math_outputs[d.enable_index]
-                        gate_enabled = gate_value >= 1.0
-                    else:
-                        gate_value = 0.0
-                        gate_enabled = False
-                elif d.enable_kind == "expr" and expr_outputs is not None:
-                    if d.enable_index < len(expr_outputs):
-                        gate_value = expr_outputs[d.enable_index]
-                        gate_enabled = gate_value >= 1.0
-                    else:
-                        gate_value = 0.0
-                        gate_enabled = False
+            gate_kind = gate_code[k]
+            if gate_kind != GATE_NONE:
+                gi = gate_ch_arr[k]
+                buf = gate_sources[gate_kind]
+                if buf is not None:
+                    gate_value = buf[gi] if gi < gate_len[gate_kind] else 0.0
+                    gate_enabled = gate_value >= 1.0
                 
                 # Log and handle state transitions
-                if i < len(self.last_gate_states):
-                    if gate_enabled != self.last_gate_states[i]:
-                        gate_type = f"{d.enable_kind.upper()}{d.enable_index}"
-                        state_str = "ENABLED" if gate_enabled else "DISABLED"
-                        print(f"[PID-GATE] Loop '{d.name}': {gate_type} → {state_str}")
+                if k < n_gate_states:
+                    if gate_enabled != last_gate_states[k]:
+                        if log.isEnabledFor(logging.INFO):
+                            log.info("[PID-GATE] Loop '%s': %s%s → %s", meta[k].name, meta[k].enable_kind.upper(), gi,
+                                     "ENABLED" if gate_enabled else "DISABLED")
                         
                         # Reset PID state when transitioning to disabled
                         if not gate_enabled:
-                            p.i = 0.0
-                            p.prev = None
-                            p.tick_counter = 0
-                            print(f"[PID-GATE] Loop '{d.name}': State reset (i=0, prev=None)")
+                            i_arr[k] = 0.0
+                            prev_arr[k] = _NAN
+                            tick_arr[k] = 0
+                            if log.isEnabledFor(logging.INFO):
+                                log.info("[PID-GATE] Loop '%s': State reset (i=0, prev=None)", meta[k].name)
                             
                             # Force outputs to safe state
-                            if d.kind == "digital":
-                                bridge.set_do(d.out_ch, False, active_high=True)
-                            elif d.kind == "analog":
-                                bridge.set_ao(d.out_ch, 0.0)
+                            if kind == KIND_DIGITAL:
+                                writes[k] = (KIND_DIGITAL, out_ch_arr[k], False)
+                            elif kind == KIND_ANALOG:
+                                writes[k] = (KIND_ANALOG, out_ch_arr[k], 0.0)
                         
-                        self.last_gate_states[i] = gate_enabled
+                        last_gate_states[k] = gate_enabled
             
             # If gated, don't calculate - return zeros immediately
             if not gate_enabled:
-                tel.append({"name": d.name, "pv": 0.0, "u": 0.0, "out": 0.0, "err": 0.0, "enabled": True, "gated": True, "gate_value": gate_value})
+                t = tel[k] = tel_gated[k]
+                t["gate_value"] = gate_value
                 continue
             
             # Check if this PID should execute this cycle (decimation)
             should_execute = True
-            if d.execution_rate_hz is not None and d.execution_rate_hz > 0:
-                # Calculate decimation factor
-                decimate = max(1, int(round(sample_rate_hz / d.execution_rate_hz)))
-                p.tick_counter += 1
-                should_execute = (p.tick_counter >= decimate)
+            dt = base_dt
+            inv_dt = inv_base_dt
+            decimate = decim_arr[k]  # fixed per sample rate (see _decimation)
+            if decimate:
+                tick_arr[k] += 1
+                should_execute = (tick_arr[k] >= decimate)
                 if should_execute:
-                    p.tick_counter = 0
-                    # Use accumulated dt for this execution
-                    dt = decimate / sample_rate_hz
+                    tick_arr[k] = 0
+                    # Use accumulated dt for this execution (this loop only)
+                    dt = decimate * base_dt
+                    inv_dt = inv_base_dt / decimate
             
             # If not executing this cycle, use last output
+            # Only the I term (always current) and gate value move between executions;
+            # the rest of the row was filled when the loop last ran
             if not should_execute:
-                tel.append({
-                    "name": d.name, 
-                    "pv": p.last_pv,
-                    "u": p.last_u, 
-                    "out": p.last_u, 
-                    "err": p.last_err,
-                    "p_term": p.last_p,
-                    "i_term": p.i,  # I term is always current
-                    "d_term": p.last_d,
-                    "target": p.last_sp,  # Show last setpoint used
-                    "enabled": True, 
-                    "gated": False,
-                    "gate_value": gate_value,
-                    "skipped": True
-                })
+                t = tel[k] = tel_skip[k]
+                t["i_term"] = i_arr[k]
+                t["gate_value"] = gate_value
                 continue
             
-            # Gate enabled - calculate PID normally
-            try:
+            # Gate enabled - gather PV and setpoint for the batch update
+            src = src_code[k]
+            ch = ai_ch_arr[k]
+            buf = sources[src]
+            if ch < source_len[src]:
+                pv = buf[ch]
+            elif src == SRC_TC and tc_buf:
+                pv = tc_buf[-1]  # TC index clamps to the last channel
+            elif src == SRC_AI:
+                # AI count is only known at runtime; report it on this loop and carry on
+                tel[k] = {"name": meta[k].name, "pv": 0.0, "u": 0.0, "out": 0.0, "err": 0.0,
+                          "error": f"AI channel {ch} out of range", "enabled": True}
+                continue
+            else:
                 pv = 0.0
-                if d.src == "ai":
-                    pv = ai_vals[d.ai_ch]
-                elif d.src == "ao":
-                    # Read AO value (feedback from analog output)
-                    if d.ai_ch < len(bridge.ao_cache):
-                        pv = bridge.ao_cache[d.ai_ch]
-                elif d.src == "tc" and tc_vals:
-                    pv = tc_vals[min(d.ai_ch, len(tc_vals)-1)]
-                elif d.src == "pid" and pid_prev:
-                    # Use previous cycle's PID output (cascade control)
-                    if d.ai_ch < len(pid_prev):
-                        pv = pid_prev[d.ai_ch].get("out", 0.0)
-                elif d.src == "math" and math_outputs:
-                    # Use math operator output
-                    if d.ai_ch < len(math_outputs):
-                        pv = math_outputs[d.ai_ch]
-                elif d.src == "expr" and expr_outputs:
-                    # Use expression output as PV
-                    if d.ai_ch < len(expr_outputs):
-                        pv = expr_outputs[d.ai_ch]
-                
-                # Compute setpoint from configured source
-                sp = d.target  # Default to fixed value
-                if d.sp_source == "ao":
-                    # Read AO value as setpoint
-                    if d.sp_channel < len(bridge.ao_cache):
-                        sp = bridge.ao_cache[d.sp_channel]
-                elif d.sp_source == "math" and math_outputs:
-                    # Use math operator output as setpoint
-                    if d.sp_channel < len(math_outputs):
-                        sp = math_outputs[d.sp_channel]
-                elif d.sp_source == "expr" and expr_outputs:
-                    # Use expression output as setpoint
-                    if d.sp_channel < len(expr_outputs):
-                        sp = expr_outputs[d.sp_channel]
-                elif d.sp_source == "pid" and pid_prev:
-                    # Use another PID's output as setpoint (cascade control)
-                    if d.sp_channel < len(pid_prev):
-                        sp = pid_prev[d.sp_channel].get("out", 0.0)
-                # Note: "static" would require global variable lookup - not implemented yet
-                
-                u, err, p_term, i_term, d_term = p.step(pv, sp, dt)
-                
-                # Store last output
-                p.last_u = u
-                
-                # Calculate output value with dynamic limits
-                if d.kind == "digital":
-                    ov = 1.0 if u >= 0 else 0.0
-                elif d.kind == "var":
-                    ov = u
-                else:  # analog
+            
+            # Setpoint from configured source (fixed target by default)
+            sp = target_arr[k]
+            sc = sp_code[k]
+            if sc != SP_FIXED:
+                ch = sp_ch_arr[k]
+                if ch < source_len[sc]:
+                    sp = sources[sc][ch]
+            # Note: "static" would require global variable lookup - not implemented yet
+            
+            run_k.append(k)
+            run_pv.append(pv)
+            run_sp.append(sp)
+            run_dt.append(dt)
+            run_inv.append(inv_dt)
+            run_gate.append(gate_value)
+        
+        # ---- Phase 2: one PID sweep over every loop that runs this tick ----
+        u_buf, e_buf, p_buf, d_buf = self.u_buf, self.e_buf, self.p_buf, self.d_buf
+        _pid_sweep(run_k, run_pv, run_sp, run_dt, run_inv, self.step_fns, i_arr, prev_arr,
+                   u_buf, e_buf, p_buf, d_buf)
+        
+        # ---- Phase 3: outputs and telemetry for the loops that ran ----
+        for k, pv, sp, gate_value in zip(run_k, run_pv, run_sp, run_gate):
+            kind = kind_code[k]
+            u, err, p_term, i_term, d_term = u_buf[k], e_buf[k], p_buf[k], i_arr[k], d_buf[k]
+            
+            # Calculate output value with dynamic limits
+            if kind == KIND_DIGITAL:
+                ov = 1.0 if u >= 0 else 0.0
+                writes[k] = (KIND_DIGITAL, out_ch_arr[k], u >= 0.0)
+            elif kind == KIND_VAR:
+                ov = u  # var kind never writes to hardware
+            else:  # analog
+                lo = out_min_arr[k]
+                hi = out_max_arr[k]
+                if n_math:
                     # Compute out_min (fixed or from math)
-                    if d.out_min_source == "math" and math_outputs:
-                        lo = math_outputs[d.out_min_channel] if d.out_min_channel < len(math_outputs) else -10.0
-                    else:
-                        lo = -10.0 if d.out_min is None else d.out_min
-                    
+                    c = lim_lo_ch[k]
+                    if c >= 0:
+                        lo = math_outputs[c] if c < n_math else -10.0
                     # Compute out_max (fixed or from math)
-                    if d.out_max_source == "math" and math_outputs:
-                        hi = math_outputs[d.out_max_channel] if d.out_max_channel < len(math_outputs) else 10.0
-                    else:
-                        hi = 10.0 if d.out_max is None else d.out_max
-                    
-                    ov = max(lo, min(hi, u))
-                
-                # Write to hardware (we only get here if gate_enabled or no gate)
-                if d.kind == "digital":
-                    bridge.set_do(d.out_ch, u >= 0.0, active_high=True)
-                elif d.kind == "analog":
-                    bridge.set_ao(d.out_ch, ov)
-                # var kind never writes to hardware
+                    c = lim_hi_ch[k]
+                    if c >= 0:
+                        hi = math_outputs[c] if c < n_math else 10.0
                 
-                tel.append({
-                    "name": d.name, 
-                    "pv": pv, 
-                    "u": u, 
-                    "out": ov, 
-                    "err": err, 
-                    "p_term": p_term,
-                    "i_term": i_term,
-                    "d_term": d_term,
-                    "target": sp,  # Show actual setpoint used (may be from AO/Math)
-                    "enabled": True, 
-                    "gated": False,
-                    "gate_value": gate_value
-                })
-            except Exception as e:
-                # Log error but continue with other PIDs
-                print(f"[PID] Loop '{d.name}' (kind={d.kind}) failed: {e}")
-                tel.append({"name": d.name, "pv": 0.0, "u": 0.0, "out": 0.0, "err": 0.0, "error": str(e), "enabled": True})
-        return tel
\ No newline at end of file
+                # Same as max(lo, min(hi, u))
+                ov = u if u < hi else hi
+                ov = ov if ov > lo else lo
+                writes[k] = (KIND_ANALOG, out_ch_arr[k], ov)
+            
+            t = tel[k] = tel_run[k]
+            t["pv"] = pv
+            t["u"] = u
+            t["out"] = ov
+            t["err"] = err
+            t["p_term"] = p_term
+            t["i_term"] = i_term
+            t["d_term"] = d_term
+            t["target"] = sp  # Show actual setpoint used (may be from AO/Math)
+            t["gate_value"] = gate_value
+            
+            if exec_hz_arr[k] > 0.0:
+                # Decimated loop: refresh the row its skip cycles report
+                t = tel_skip[k]
+                t["pv"] = pv
+                t["u"] = t["out"] = u
+                t["err"] = err
+                t["p_term"] = p_term
+                t["d_term"] = d_term
+                t["target"] = sp
+        
+        # ---- Phase 4: hand this tick's writes to the bridge I/O thread ----
+        pending = {}
+        for w in writes:
+            if w is not None:
+                kind, ch, value = w
+                pending[kind, ch] = value
+        if pending:
+            self._queue_writes(bridge, pending)
+        return tel
@@ -8,12 +8,12 @@ __updated__ = "2026-01-14 23:30:56"
 
 # server/server.py
 # Python 3.10+
-import asyncio, json, time, os, sys
+import asyncio, gc, json, time, os, sys
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 from collections import deque
-from threading import Lock, Thread, Event
+from threading import Thread, Event
 import threading  # For threading.Event() in expressions
 from concurrent.futures import ThreadPoolExecutor
 
@@ -23,7 +23,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from mcc_bridge import MCCBridge, AIFrame
-from mcc_bridge import BRIDGE_VERSION, HAVE_MCCULW, HAVE_ULDAQ
+import mcc_bridge
+from mcc_bridge import BRIDGE_VERSION, HAVE_MCCULW
 from pid_core import PIDManager
 from filters import OnePoleLPFBank
 from logger import SessionLogger
@@ -40,11 +41,21 @@ from app_models import LEFile, LogicElementCfg
 from expr_manager import ExpressionManager
 from expr_engine import Lexer, Parser, Evaluator  # For pre-compilation
 from expr_engine import global_vars as expr_global_vars
-import logging, os, math
+import logging, logging.handlers, os, math, queue
+
+# Optional fast JSON encoder for the WebSocket stream (falls back to json in a thread)
+HAVE_ORJSON = False
+try:
+    import orjson
+    HAVE_ORJSON = True
+except Exception:
+    orjson = None  # type: ignore
+    HAVE_ORJSON = False
 
 
 MCC_TICK_LOG = os.environ.get("MCC_TICK_LOG", "1") == "1"  # print 1 line per second
 MCC_DUMP_FIRST = int(os.environ.get("MCC_DUMP_FIRST", "5")) # dump first N ticks fully
+MCC_EXPR_PROFILE = os.environ.get("MCC_EXPR_PROFILE", "0") == "1"  # time each expression, report >5ms
 
 ROOT = Path(__file__).resolve().parent.parent
 CFG_DIR = ROOT/"server/config"
@@ -64,6 +75,45 @@ logging.basicConfig(
 log = logging.getLogger("mcc")
 
 
+class _RootForwarder(logging.Handler):
+    """Listener-side handler: pass queued records on to the root logger's handlers"""
+    def emit(self, record):
+        logging.getLogger().handle(record)
+
+
+class _RepeatFilter(logging.Filter):
+    """
+    Drop a record if the same rendered message was let through less
+    than `window` seconds ago, so a flapping gate or a failing output logs at
+    most once per second per distinct message instead of once per tick.
+    """
+    def __init__(self, window: float = 1.0):
+        super().__init__()
+        self.window = window
+        self._last: Dict[tuple, float] = {}
+
+    def filter(self, record):
+        key = record.getMessage()  # rendered, so e.g. fresh exception objects still match
+        now = time.monotonic()
+        last = self._last.get(key)
+        if last is not None and now - last < self.window:
+            return False
+        if len(self._last) > 1024:
+            self._last.clear()
+        self._last[key] = now
+        return True
+
+
+# pid_core's "pid" logger runs on the control loop: while the app is up its records
+# are only enqueued, and a listener thread does the console/file I/O so a slow flush
+# can't stall a tick. Attached in _on_startup, stopped (queue drained) in _on_shutdown.
+pid_log = logging.getLogger("pid")
+_pid_log_queue = queue.SimpleQueue()
+_pid_log_handler = logging.handlers.QueueHandler(_pid_log_queue)
+_pid_log_handler.addFilter(_RepeatFilter())
+_pid_log_listener = logging.handlers.QueueListener(_pid_log_queue, _RootForwarder())
+
+
 print(f"[MCC-Hub] Python {sys.version.split()[0]} on {sys.platform}")
 print(f"[MCC-Hub] Server version {__version__} (updated: {__updated__})")
 print(f"[MCC-Hub] ROOT={ROOT}")
@@ -118,7 +168,7 @@ def api_diag():
         "server": __version__,
         "bridge": BRIDGE_VERSION,
         "have_mcculw": bool(HAVE_MCCULW),
-        "have_uldaq": bool(HAVE_ULDAQ),
+        "have_uldaq": bool(mcc_bridge.HAVE_ULDAQ),  # resolved lazily at open()
         "board1608": b1608,
         "boardetc": betc,
     }
@@ -162,14 +212,16 @@ def put_layout(body: dict):
 # ---- Serve index and assets explicitly so /ws is not intercepted ----
 from fastapi.responses import FileResponse, HTMLResponse
 
+# FileResponse streams straight from disk (no read + decode per request) and
+# still picks up edits to the file, which the no-cache middleware relies on
 @app.get("/", response_class=HTMLResponse)
 def _root():
-    return (WEB_DIR / "index.html").read_text(encoding="utf-8")
+    return FileResponse(str(WEB_DIR / "index.html"), media_type="text/html")
 
 @app.get("/index.html", response_class=HTMLResponse)
 def _root_index():
     # Serve the same file for /index.html as for /
-    return (WEB_DIR / "index.html").read_text(encoding="utf-8")
+    return FileResponse(str(WEB_DIR / "index.html"), media_type="text/html")
 
 @app.get("/app.js")
 def _app_js():
@@ -298,7 +350,12 @@ mcc = MCCBridge()
 bridge = mcc  # alias for older handlers that still say 'bridge'
 
 pid_mgr = PIDManager()
-pid_mgr.load(pid_file)
+try:
+    pid_mgr.load(pid_file)
+except ValueError as e:
+    # Don't let one bad loop stop the server; the file stays on disk for the editor to fix
+    print(f"[MCC-Hub] PID config rejected ({e}); starting with no PID loops")
+    pid_mgr.load(PIDFile())
 
 motor_mgr = MotorManager()
 
@@ -364,6 +421,21 @@ for i, expr in enumerate(expr_mgr.expressions):
 
 log.info(f"[EXPR] Pre-compiled {len(expr_ast_cache)} expressions")
 
+# Blocking DOs as global indices (board * 8 + bit), rebuilt whenever app_cfg is replaced
+_blocking_do = (None, frozenset())
+
+def _blocking_do_channels() -> frozenset:
+    global _blocking_do
+    cfg, channels = _blocking_do
+    if cfg is not app_cfg:
+        channels = frozenset(
+            board_idx * 8 + do_idx
+            for board_idx, board_cfg in enumerate(app_cfg.boards1608) if board_cfg.enabled
+            for do_idx, do_cfg in enumerate(board_cfg.digitalOutputs) if getattr(do_cfg, 'blocking', False)
+        )
+        _blocking_do = (app_cfg, channels)
+    return channels
+
 # Fast evaluation using pre-compiled AST
 def evaluate_compiled_expressions(signal_state, bridge=None, sample_rate_hz=25.0):
     """
@@ -371,10 +443,31 @@ def evaluate_compiled_expressions(signal_state, bridge=None, sample_rate_hz=25.0
     """
     telemetry = []
     
-    for i, expr in enumerate(expr_mgr.expressions):
+    # Per-expression state lists and caches, bound once per call
+    outputs, tick_counters, last_telemetry = expr_mgr.outputs, expr_mgr.tick_counters, expr_mgr.last_telemetry
+    n_last = len(last_telemetry)
+    get_ast = expr_ast_cache.get
+    hw_cache = evaluate_compiled_expressions.hw_cache
+    # Later expressions read earlier results straight from the outputs list
+    # (updated in place below) instead of a fresh copy after every expression
+    signal_state['expr'] = outputs
+    
+    # Samples per execution for each expression (0 = every pass), rebuilt only
+    # when the expression list or the evaluation rate changes
+    expressions = expr_mgr.expressions
+    cached_exprs, cached_rate, decim = evaluate_compiled_expressions.decim_cache
+    if cached_exprs is not expressions or cached_rate != sample_rate_hz:
+        decim = tuple(
+            max(1, int(round(sample_rate_hz / e.execution_rate_hz)))
+            if e.execution_rate_hz is not None and e.execution_rate_hz > 0 else 0
+            for e in expressions
+        )
+        evaluate_compiled_expressions.decim_cache = (expressions, sample_rate_hz, decim)
+    
+    for i, expr in enumerate(expressions):
         if not expr.enabled:
-            expr_mgr.outputs[i] = 0.0
-            expr_mgr.tick_counters[i] = 0
+            outputs[i] = 0.0
+            tick_counters[i] = 0
             telemetry.append({
                 'name': expr.name,
                 'output': 0.0,
@@ -385,24 +478,25 @@ def evaluate_compiled_expressions(signal_state, bridge=None, sample_rate_hz=25.0
         
         # Check decimation
         should_execute = True
-        if expr.execution_rate_hz is not None and expr.execution_rate_hz > 0:
-            decimate = max(1, int(round(sample_rate_hz / expr.execution_rate_hz)))
-            expr_mgr.tick_counters[i] += 1
-            should_execute = (expr_mgr.tick_counters[i] >= decimate)
+        decimate = decim[i]
+        if decimate:
+            tick_counters[i] += 1
+            should_execute = (tick_counters[i] >= decimate)
             if should_execute:
-                expr_mgr.tick_counters[i] = 0
+                tick_counters[i] = 0
         
         if not should_execute:
             # Return cached telemetry
-            cached = expr_mgr.last_telemetry[i].copy() if i < len(expr_mgr.last_telemetry) else {}
+            cached = last_telemetry[i].copy() if i < n_last else {}
             cached['skipped'] = True
             telemetry.append(cached)
             continue
         
         # Use pre-compiled AST
-        ast = expr_ast_cache.get(i)
+        ast = get_ast(i)
         if ast is None:
             # Compilation failed, skip
+            outputs[i] = 0.0
             telemetry.append({
                 'name': expr.name,
                 'output': 0.0,
@@ -413,16 +507,16 @@ def evaluate_compiled_expressions(signal_state, bridge=None, sample_rate_hz=25.0
         
         try:
             # Evaluate using cached AST (no parsing!)
-            t_eval_start = time.perf_counter()
+            if MCC_EXPR_PROFILE:
+                t_eval_start = time.perf_counter()
             evaluator = Evaluator(signal_state)
             result = evaluator.evaluate(ast)
-            t_eval = (time.perf_counter() - t_eval_start) * 1000
-            
-            if t_eval > 5:
-                print(f"[EXPR-SLOW] '{expr.name}' evaluation took {t_eval:.1f}ms")
+            if MCC_EXPR_PROFILE:
+                t_eval = (time.perf_counter() - t_eval_start) * 1000
+                if t_eval > 5:
+                    print(f"[EXPR-SLOW] '{expr.name}' evaluation took {t_eval:.1f}ms")
             
-            expr_mgr.outputs[i] = result
-            signal_state['expr'] = expr_mgr.outputs.copy()
+            outputs[i] = result
             
             # Apply hardware writes (NON-BLOCKING - use thread pool)
             if bridge and evaluator.hardware_writes:
@@ -432,30 +526,11 @@ def evaluate_compiled_expressions(signal_state, bridge=None, sample_rate_hz=25.0
                         cache_key = f"{write['type']}_{write['channel']}"
                         
                         # Check if value changed
-                        if not hasattr(evaluate_compiled_expressions, 'hw_cache'):
-                            evaluate_compiled_expressions.hw_cache = {}
-                        
-                        if evaluate_compiled_expressions.hw_cache.get(cache_key) != write['value']:
+                        if hw_cache.get(cache_key) != write['value']:
                             # Value changed - write to hardware
                             
                             # Check if this is a blocking DO write (pauses AI acquisition)
-                            is_blocking_do = False
-                            if write['type'] == 'do':
-                                # Check if this DO is configured as blocking
-                                channel = write['channel']
-                                for board_cfg in app_cfg.boards1608:
-                                    if not board_cfg.enabled:
-                                        continue
-                                    for do_cfg in board_cfg.digitalOutputs:
-                                        board_idx = app_cfg.boards1608.index(board_cfg)
-                                        do_idx = board_cfg.digitalOutputs.index(do_cfg)
-                                        global_do_idx = board_idx * 8 + do_idx
-                                        blocking_val = getattr(do_cfg, 'blocking', False)
-                                        if global_do_idx == channel and blocking_val:
-                                            is_blocking_do = True
-                                            break
-                                    if is_blocking_do:
-                                        break
+                            is_blocking_do = write['type'] == 'do' and write['channel'] in _blocking_do_channels()
                             
                             # Pause burst if blocking
                             if is_blocking_do:
@@ -480,7 +555,7 @@ def evaluate_compiled_expressions(signal_state, bridge=None, sample_rate_hz=25.0
                                 print(f"[HW-TIMING] {write['type'].upper()}{write['channel']} write took {t_hw_elapsed:.1f}ms{mode}")
                             
                             # Update cache
-                            evaluate_compiled_expressions.hw_cache[cache_key] = write['value']
+                            hw_cache[cache_key] = write['value']
                     except Exception as e:
                         print(f"[EXPR] Hardware write failed: {e}")
             
@@ -495,10 +570,11 @@ def evaluate_compiled_expressions(signal_state, bridge=None, sample_rate_hz=25.0
                 'branches': evaluator.branch_paths,
                 'executed_lines': list(evaluator.executed_lines)
             }
-            expr_mgr.last_telemetry[i] = tel
+            last_telemetry[i] = tel
             telemetry.append(tel)
             
         except Exception as e:
+            outputs[i] = 0.0
             telemetry.append({
                 'name': expr.name,
                 'output': 0.0,
@@ -508,6 +584,9 @@ def evaluate_compiled_expressions(signal_state, bridge=None, sample_rate_hz=25.0
     
     return telemetry
 
+evaluate_compiled_expressions.hw_cache = {}  # last value written per "type_channel"
+evaluate_compiled_expressions.decim_cache = (None, None, ())  # (expressions list, rate, factors)
+
 
 # Button variables storage (synchronized from frontend)
 button_vars: Dict[str, float] = {}
@@ -544,21 +623,38 @@ def _on_startup():
     print(f"[VERSIONS] server.py: {__version__}")
     print(f"[VERSIONS] app_models.py: {getattr(app_models, '__version__', 'unknown')}")
     print(f"[VERSIONS] mcc_bridge.py: {getattr(mcc_bridge, '__version__', 'unknown')}")
+    print(f"[MCC-Hub] WebSocket encoder: {'orjson' if HAVE_ORJSON else 'json (thread pool)'}")
+    _pid_log_listener.start()
+    pid_log.addHandler(_pid_log_handler)
+    pid_log.propagate = False
+    # Configs, managers and compiled PID/expression code are loaded by now and live
+    # for the whole run; move them out of the collector's view so acquisition-time
+    # collections don't keep re-walking them
+    gc.collect()
+    gc.freeze()
 
 @app.on_event("shutdown")
 def _on_shutdown():
     print("[MCC-Hub] FastAPI shutdown")
     motor_mgr.disconnect_all()
     print("[MCC-Hub] Motors disconnected")
+    # Detach first so late records go straight to the root handlers, then flush the queue
+    pid_log.removeHandler(_pid_log_handler)
+    pid_log.propagate = True
+    _pid_log_listener.stop()
 
 async def broadcast(msg: dict):
-    # Offload JSON serialization to thread pool (CPU-bound)
-    loop = asyncio.get_event_loop()
     try:
-        txt = await loop.run_in_executor(
-            json_executor,
-            lambda: json.dumps(msg, separators=(",", ":"))
-        )
+        if HAVE_ORJSON:
+            # Fast enough to run inline - no thread hop
+            txt = orjson.dumps(msg, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        else:
+            # Offload JSON serialization to thread pool (CPU-bound)
+            loop = asyncio.get_event_loop()
+            txt = await loop.run_in_executor(
+                json_executor,
+                lambda: json.dumps(msg, separators=(",", ":"))
+            )
     except Exception as e:
         print(f"[WS] JSON serialization failed: {e}")
         print(f"[WS] Message type: {msg.get('type')}")
@@ -566,24 +662,28 @@ async def broadcast(msg: dict):
         traceback.print_exc()
         return
     
-    living = []
-    sent_count = 0
-    for ws in ws_clients:
-        try:
-            await ws.send_text(txt)
-            living.append(ws)
-            sent_count += 1
-        except Exception as e:
+    # Send to all clients concurrently so one slow client doesn't hold up the rest
+    # (snapshot: clients may connect/disconnect while the sends are in flight)
+    clients = ws_clients[:]
+    results = await asyncio.gather(*[ws.send_text(txt) for ws in clients], return_exceptions=True)
+    dead = []
+    for ws, r in zip(clients, results):
+        if isinstance(r, Exception):
             # Client disconnected
-            print(f"[WS] Client send failed: {e}")
-            pass
-    ws_clients[:] = living
-    if sent_count == 0 and len(ws_clients) > 0:
-        print(f"[WS] WARNING: Had {len(ws_clients)} clients but sent to 0!")
+            print(f"[WS] Client send failed: {r}")
+            dead.append(ws)
+    if dead:
+        # Only rebuild the client list when something actually failed
+        dead_ids = {id(ws) for ws in dead}
+        ws_clients[:] = [ws for ws in ws_clients if id(ws) not in dead_ids]
+    if clients and len(dead) == len(clients):
+        print(f"[WS] WARNING: Had {len(clients)} clients but sent to 0!")
 
 # ========== BURST MODE GLOBALS ==========
-sample_buffer = deque(maxlen=2000)  # Larger buffer to reduce lock contention
-buffer_lock = Lock()
+# Single producer (burst thread) / single consumer (acq_loop). No lock: deque
+# extend(), popleft() and len() are each atomic in CPython, the producer only
+# appends and the consumer only pops, so the length the consumer sees never shrinks
+sample_buffer = deque(maxlen=2000)
 burst_rate_hz = 1000  # Hardware burst acquisition rate
 burst_running = Event()  # Signal to stop acquisition thread
 burst_paused = Event()   # Signal to pause acquisition for blocking DO writes
@@ -611,34 +711,46 @@ def burst_acquisition_thread():
     
     # Determine which boards to acquire from (skip DO-only boards)
     # For now, hardcode to board #2 only (skip #0)
-    ai_boards = [2]  # TODO: Auto-detect from config
-    print(f"[BURST] Acquiring from boards: {ai_boards}")
+    ai_boards = (2,)  # TODO: Auto-detect from config
+    print(f"[BURST] Acquiring from boards: {list(ai_boards)}")
     
     burst_count = 0
     error_count = 0
+    resync_count = 0  # since the last stats line; only the first resync is printed
+    resync_logged = False
     last_stats = time.perf_counter()
-    last_burst = time.perf_counter()
+    next_burst = time.perf_counter()  # deadline for the next burst
+    plan_rate = None  # acq_rate_hz the block plan below was built for
     
     try:
         while burst_running.is_set():
             try:
-                # Calculate block size based on ACQUISITION rate, not display rate
-                # Use 1/10th of acquisition rate (100ms of data) OR minimum 20 samples
-                # This keeps hardware lock time reasonable while allowing high sample rates
-                block_size = max(20, int(acq_rate_hz / 10))
-                
-                if burst_count == 0:
-                    print(f"[BURST] Block size: {block_size} samples ({block_size/acq_rate_hz*1000:.1f}ms lock time) for {acq_rate_hz} Hz acquisition")
-                
-                burst_interval = block_size / max(1.0, acq_rate_hz)  # seconds between bursts
-                
-                # Wait until it's time for next burst
-                now = time.perf_counter()
-                time_since_last = now - last_burst
-                if time_since_last < burst_interval:
-                    time.sleep(burst_interval - time_since_last)
+                # Block plan only changes with the acquisition rate - rebuild it then
+                if acq_rate_hz != plan_rate:
+                    plan_rate = acq_rate_hz
+                    # Calculate block size based on ACQUISITION rate, not display rate
+                    # Use 1/10th of acquisition rate (100ms of data) OR minimum 20 samples
+                    # This keeps hardware lock time reasonable while allowing high sample rates
+                    block_size = max(20, int(plan_rate / 10))
+                    burst_interval = block_size / max(1.0, plan_rate)  # seconds between bursts
+                    burst_rate = int(plan_rate)
+                    print(f"[BURST] Block size: {block_size} samples ({block_size/plan_rate*1000:.1f}ms lock time) for {plan_rate} Hz acquisition")
                 
-                last_burst = time.perf_counter()
+                # Wait until it's time for next burst. Deadlines advance by a fixed
+                # interval, so late wake-ups don't accumulate into rate drift
+                sleep_for = next_burst - time.perf_counter()
+                if sleep_for > 0:
+                    time.sleep(sleep_for)
+                elif sleep_for < -2 * burst_interval:
+                    # Fell more than two bursts behind - restart the schedule from now
+                    # instead of reading back-to-back to catch up
+                    if not resync_logged:
+                        print(f"[BURST] {-sleep_for*1000:.0f}ms behind schedule, resyncing "
+                              f"(further resyncs are counted in the stats line)")
+                        resync_logged = True
+                    resync_count += 1
+                    next_burst = time.perf_counter()
+                next_burst += burst_interval
                 
                 # Check if blocking DO write is happening
                 if burst_paused.is_set():
@@ -648,15 +760,13 @@ def burst_acquisition_thread():
                 # Read burst from hardware (ONLY from AI boards, skip DO-only boards)
                 try:
                     # Try passing samples parameter if supported
-                    burst_samples = mcc.read_ai_all_burst(rate_hz=int(acq_rate_hz), samples=block_size, board_filter=ai_boards)
+                    burst_samples = mcc.read_ai_all_burst(rate_hz=burst_rate, samples=block_size, board_filter=ai_boards)
                 except TypeError:
                     # Fallback if params not supported
-                    burst_samples = mcc.read_ai_all_burst(rate_hz=int(acq_rate_hz))
+                    burst_samples = mcc.read_ai_all_burst(rate_hz=burst_rate)
                 
-                # Add all samples to ring buffer (thread-safe)
-                with buffer_lock:
-                    for sample in burst_samples:
-                        sample_buffer.append(sample)
+                # Add all samples to ring buffer (one atomic C-level extend)
+                sample_buffer.extend(burst_samples)
                 
                 burst_count += 1
                 
@@ -668,10 +778,12 @@ def burst_acquisition_thread():
                     rate = samples_acquired / elapsed
                     buffer_size = len(sample_buffer)
                     
-                    print(f"[BURST] Acq rate: {rate:.1f} Hz (target: {acq_rate_hz} Hz) | Buffer: {buffer_size} samples | Errors: {error_count}")
+                    resyncs = f" | Resyncs: {resync_count}" if resync_count else ""
+                    print(f"[BURST] Acq rate: {rate:.1f} Hz (target: {acq_rate_hz} Hz) | Buffer: {buffer_size} samples | Errors: {error_count}{resyncs}")
                     
                     burst_count = 0
                     error_count = 0
+                    resync_count = 0
                     last_stats = now
                 
             except Exception as e:
@@ -735,22 +847,31 @@ async def acq_loop():
 
     # Start hardware
     try:
-        mcc.open(app_cfg)
+        await mcc.open_async(app_cfg)
         print("[MCC-Hub] Hardware open() complete")
         
         # Initialize analog outputs to startup values
         # Set multiple times because hardware may reset to default (often 1V for AO0)
         print("[MCC-Hub] Initializing AOs to startup values...")
+        all_aos = get_all_analog_outputs(app_cfg)
         for attempt in range(3):  # Try 3 times
-            for i, ao_cfg in enumerate(get_all_analog_outputs(app_cfg)):
-                if ao_cfg.include:
-                    try:
-                        mcc.set_ao(i, ao_cfg.startupV)
-                        if attempt == 0:
-                            print(f"[MCC-Hub]   AO{i} -> {ao_cfg.startupV}V (startup)")
-                    except Exception as e:
-                        if attempt == 0:
-                            print(f"[MCC-Hub]   AO{i} FAILED: {e}")
+            # Each E-1608 owns 2 AOs - write both in one scan when both are included
+            for i in range(0, len(all_aos), 2):
+                pair = all_aos[i:i + 2]
+                try:
+                    if len(pair) == 2 and pair[0].include and pair[1].include:
+                        mcc.set_ao_pair(i // 2, pair[0].startupV, pair[1].startupV)
+                    else:
+                        for j, ao_cfg in enumerate(pair):
+                            if ao_cfg.include:
+                                mcc.set_ao(i + j, ao_cfg.startupV)
+                    if attempt == 0:
+                        for j, ao_cfg in enumerate(pair):
+                            if ao_cfg.include:
+                                print(f"[MCC-Hub]   AO{i + j} -> {ao_cfg.startupV}V (startup)")
+                except Exception as e:
+                    if attempt == 0:
+                        print(f"[MCC-Hub]   AO{i}-AO{i + len(pair) - 1} FAILED: {e}")
             await asyncio.sleep(0.05)  # Small delay between attempts
         
         print("[MCC-Hub] AO initialization complete")
@@ -792,8 +913,7 @@ async def acq_loop():
             expected_samples = int(acq_rate_hz / TARGET_UI_HZ)
             
             # Check how many samples are available
-            with buffer_lock:
-                available_samples = len(sample_buffer)
+            available_samples = len(sample_buffer)
             
             # Skip if buffer too small (startup warmup)
             if ticks < 10 and available_samples < 10:
@@ -818,7 +938,12 @@ async def acq_loop():
 
             frames_this_cycle = []
             
-            for sample_idx in range(samples_to_grab):
+            # Take the whole batch up front; the burst thread only ever adds
+            # samples, so at least samples_to_grab are still there
+            popleft = sample_buffer.popleft
+            batch_raw = [popleft() for _ in range(samples_to_grab)]
+            
+            for sample_idx, ai_raw in enumerate(batch_raw):
                 sample_start = time.perf_counter()
                 t1 = sample_start
                 
@@ -837,31 +962,13 @@ async def acq_loop():
                     _need_reconfig_filters = False
                     print(f"[MCC-Hub] Reconfigured LPF for rate {acq_rate_hz} Hz")
                 
-                t2 = time.perf_counter()
-
-                # --- Get one sample from buffer ---
-                # Buffer should stay near zero if processing rate matches acquisition
-                with buffer_lock:
-                    buffer_size = len(sample_buffer)
-                
-                    if buffer_size == 0:
-                        # Buffer empty - skip this sample (acquisition warming up)
-                        continue  # Skip to next sample
-                    else:
-                        ai_raw = sample_buffer.popleft()
-                    
-                        # Monitor buffer health (removed debug print)
-                
                 t3 = time.perf_counter()
-                
-                if (t3 - t2) > 0.01:  # If buffer access took >10ms
-                    print(f"[TIMING-DEBUG] Buffer access took {(t3-t2)*1000:.1f}ms with {buffer_size} samples in buffer")
 
                 # --- Read TCs at a much lower rate ---
                 now_tc = time.perf_counter()
                 if now_tc - last_tc_time >= min_tc_interval:
                     try:
-                        last_tc_vals = mcc.read_tc_all()
+                        last_tc_vals = await mcc.aread_tc_all()
                     except Exception as e:
                         print(f"[MCC-Hub] TC read failed: {e}")
                         # keep last_tc_vals as-is on failure
@@ -1085,7 +1192,7 @@ async def acq_loop():
                 def clean_for_json(obj):
                     if isinstance(obj, float):
                         return None if not math.isfinite(obj) else obj
-                    elif isinstance(obj, list):
+                    elif isinstance(obj, (list, tuple)):
                         return [clean_for_json(item) for item in obj]
                     elif isinstance(obj, dict):
                         return {k: clean_for_json(v) for k, v in obj.items()}
@@ -1222,8 +1329,7 @@ async def acq_loop():
                 
                 # Always print at low display rates for visibility
                 if TARGET_UI_HZ <= 5.0 or ticks % 100 == 0:
-                    with buffer_lock:
-                        buf_size = len(sample_buffer)
+                    buf_size = len(sample_buffer)
                     cycle_time = (time.perf_counter() - display_start) * 1000
                     print(f"[TIMER@{TARGET_UI_HZ}Hz] Processed {len(frames_this_cycle)} samples in {cycle_time:.1f}ms | Buffer: {buf_size}")
 
@@ -1297,9 +1403,13 @@ def get_pid():
 @app.put("/api/pid")
 def put_pid(body: dict):
     global pid_file
-    pid_file = PIDFile.model_validate(body)
+    new_file = PIDFile.model_validate(body)
+    try:
+        pid_mgr.load(new_file)  # validates every loop before anything is swapped or saved
+    except ValueError as e:
+        return {"ok": False, "error": str(e)}
+    pid_file = new_file
     PID_PATH.write_text(json.dumps(pid_file.model_dump(), indent=2))
-    pid_mgr.load(pid_file)
     print("[MCC-Hub] PID file updated")
     return {"ok": True}
 
@@ -1472,9 +1582,9 @@ def put_motors(body: dict):
     return {"ok": True}
 
 @app.get("/api/motors/ports")
-def get_serial_ports():
-    """List available COM ports"""
-    return {"ports": list_serial_ports()}
+def get_serial_ports(refresh: bool = False):
+    """List available COM ports (?refresh=true bypasses the short enumeration cache)"""
+    return {"ports": list_serial_ports(force=refresh)}
 
 
 @app.get("/api/logic_elements")